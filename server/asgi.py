@@ -0,0 +1,347 @@
+"""ASGI entry point for serving the API from an event loop.
+
+    uvicorn asgi:application --port 5555
+
+Signup, Login, CheckSession, Logout and /recipes (GET and POST) are served
+by async handlers over an async SQLAlchemy engine, so a request waiting on
+bcrypt or the database doesn't hold a thread. They behave exactly like the
+Flask resources in resources.py, and run inside a Flask request context so
+the app's request hooks and session saving apply to them too. Every other
+route is handed to the Flask app through asgiref's WSGI adapter.
+"""
+
+import asyncio
+import contextvars
+from io import BytesIO
+
+from asgiref.wsgi import WsgiToAsgi
+from flask import Response, g
+from sqlalchemy import event, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import undefer_group
+from werkzeug.exceptions import HTTPException
+
+from app import app
+from cache import user_cache
+from config import db, hasher
+from database import WriteTrackingSession, sqlite_pragma_listener
+from hashing import HashingBusy
+from models import TEXT_COLUMNS, Recipe, TableVersion, User, recipe_serializer, user_serializer
+from resources import (
+    BUSY_RESPONSE, etag_headers, keyset_args, make_etag, not_modified, requested_fields,
+    too_many_attempts, valid_credentials, validate_recipe, validate_signup,
+)
+from responses import output_json
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def create_engine_for(flask_app):
+    """Async engine for the app's primary database, with the same SQLite pragmas."""
+    with flask_app.app_context():
+        url = db.engine.url
+    if url.get_backend_name() not in ASYNC_DRIVERS:
+        raise RuntimeError(f"No async driver configured for {url.drivername!r}")
+    engine = create_async_engine(url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()]))
+
+    pragmas = flask_app.config["SQLITE_PRAGMAS"]
+    if url.get_backend_name() == "sqlite" and pragmas:
+        event.listen(engine.sync_engine, "connect", sqlite_pragma_listener(pragmas))
+
+    return engine
+
+
+def build_environ(scope, body):
+    """Just enough of a WSGI environ for werkzeug's Request to read an ASGI request."""
+    server = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": (scope.get("client") or ("", 0))[0],
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": BytesIO(body),
+    }
+    for name, value in scope["headers"]:
+        name = name.decode("latin-1").upper().replace("-", "_")
+        key = name if name in ("CONTENT_TYPE", "CONTENT_LENGTH") else f"HTTP_{name}"
+        value = value.decode("latin-1")
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+    environ["CONTENT_LENGTH"] = str(len(body))
+    return environ
+
+
+async def current_versions(db_session, *names):
+    """TableVersion.current for an AsyncSession."""
+    rows = await db_session.execute(
+        select(TableVersion.name, TableVersion.version).where(TableVersion.name.in_(names))
+    )
+    versions = dict(rows.all())
+    return tuple(versions.get(name, 0) for name in names)
+
+
+class AsyncAPI:
+    """ASGI app routing a few paths to async handlers and the rest to Flask.
+
+    Handlers take ``(request, session, db_session)`` and return what a
+    Flask-RESTful method would: a Response or ``(data, status[, headers])``.
+    The Flask session interface is reused, so both modes share cookies and
+    the server-side session store.
+    """
+
+    def __init__(self, flask_app, engine):
+        self.flask_app = flask_app
+        self.engine = engine
+        self.sessionmaker = async_sessionmaker(
+            engine, expire_on_commit=False, sync_session_class=WriteTrackingSession
+        )
+        self.fallback = WsgiToAsgi(flask_app)
+        self.routes = {}
+
+    def route(self, path, *methods):
+        def decorator(handler):
+            for method in methods:
+                self.routes[(path, method)] = handler
+            return handler
+        return decorator
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self.lifespan(receive, send)
+
+        handler = self.routes.get((scope.get("path"), scope.get("method")))
+        if handler is None:
+            return await self.fallback(scope, receive, send)
+
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+
+        response = await self.dispatch(handler, build_environ(scope, body))
+        await send({
+            "type": "http.response.start",
+            "status": response.status_code,
+            "headers": [
+                (name.lower().encode("latin-1"), value.encode("latin-1"))
+                for name, value in response.headers.items()
+            ],
+        })
+        await send({"type": "http.response.body", "body": response.get_data()})
+
+    async def dispatch(self, handler, environ):
+        """Runs a handler inside a Flask request context.
+
+        The app's before_request and after_request hooks (metrics, the
+        read-your-writes cookie, compression) and session saving run just as
+        for a Flask view.
+        """
+        flask_app = self.flask_app
+        interface = flask_app.session_interface
+        loop = asyncio.get_running_loop()
+
+        ctx = flask_app.request_context(environ)
+        # Session stores do blocking I/O, so they run on the default executor;
+        # a session set up front keeps the push from opening it on the loop.
+        ctx.session = await loop.run_in_executor(
+            None, interface.open_session, flask_app, ctx.request
+        )
+        if ctx.session is None:
+            ctx.session = interface.make_null_session(flask_app)
+
+        with ctx:
+            rv = flask_app.preprocess_request()
+            if rv is None:
+                try:
+                    async with self.sessionmaker() as db_session:
+                        rv = await handler(ctx.request, ctx.session, db_session)
+                    if db_session.sync_session.info.pop("wrote", False):
+                        g.db_wrote = True
+                except HTTPException as e:
+                    rv = {"message": e.description}, e.code
+
+            response = rv if isinstance(rv, Response) else self.make_response(*rv)
+            return await loop.run_in_executor(
+                None, contextvars.copy_context().run, flask_app.process_response, response
+            )
+
+    @staticmethod
+    def make_response(data, code=200, headers=None):
+        return output_json(data, code, headers)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.engine.dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+
+application = AsyncAPI(app, create_engine_for(app))
+
+
+@application.route("/signup", "POST")
+async def signup(request, session, db_session):
+    """Handles user registration."""
+    fields, error = validate_signup(request.get_json())
+    if error:
+        return {"error": error}, 422
+
+    try:
+        password = fields.pop("password")
+        user = User(**fields)
+        await user.set_password_async(password)
+
+        db_session.add(user)
+        await db_session.commit()
+
+        session["user_id"] = user.id
+
+        return user_serializer.dump(user), 201
+    except IntegrityError:
+        await db_session.rollback()
+        return {"error": "Username already exists."}, 422
+    except HashingBusy:
+        return BUSY_RESPONSE
+
+
+@application.route("/check_session", "GET")
+async def check_session(request, session, db_session):
+    """Checks if a user is logged in."""
+    user_id = session.get("user_id")
+    if user_id:
+        cached = user_cache.get(user_id)
+        if cached is None:
+            user = await db_session.get(User, user_id, options=[undefer_group(TEXT_COLUMNS)])
+            if user is None:
+                return {"error": "Unauthorized"}, 401
+            profile = user_serializer.dump(user)
+            cached = (profile, make_etag(profile))
+            user_cache.set(user_id, cached)
+
+        profile, etag = cached
+        if request.if_none_match.contains_weak(etag):
+            return not_modified(etag)
+        return profile, 200, etag_headers(etag)
+    return {"error": "Unauthorized"}, 401
+
+
+@application.route("/login", "POST")
+async def login(request, session, db_session):
+    """Handles user login."""
+    data = request.get_json()
+    username = data.get("username")
+    password = data.get("password")
+    if not valid_credentials(username, password):
+        return {"error": "Invalid credentials"}, 401
+
+    limiter = app.extensions["login_limiter"]
+    if limiter:
+        retry_after = await asyncio.get_running_loop().run_in_executor(
+            None, limiter.check, request.remote_addr, username
+        )
+        if retry_after:
+            return too_many_attempts(retry_after)
+
+    user = (await db_session.scalars(select(User).filter_by(username=username))).first()
+    try:
+        if user is None:
+            authenticated = await hasher.check_dummy_async(password)
+        else:
+            authenticated = await user.check_password_async(password)
+    except HashingBusy:
+        return BUSY_RESPONSE
+
+    if authenticated:
+        if user.needs_rehash():
+            try:
+                await user.set_password_async(password)
+                await db_session.commit()
+            except HashingBusy:
+                await db_session.rollback()
+
+        session["user_id"] = user.id
+        # Deferred columns can't lazy load under asyncio, so bio is fetched
+        # explicitly, and only once the password checked out.
+        await db_session.refresh(user, ["bio"])
+        return user_serializer.dump(user), 200
+
+    return {"error": "Invalid credentials"}, 401
+
+
+@application.route("/logout", "DELETE")
+async def logout(request, session, db_session):
+    """Logs the user out."""
+    if "user_id" not in session or session["user_id"] is None:
+        return {"error": "Unauthorized"}, 401
+
+    session.pop("user_id")
+    return {}, 204
+
+
+@application.route("/recipes", "GET")
+async def recipe_index(request, session, db_session):
+    """Fetches recipes for logged-in users, optionally one keyset page at a time."""
+    if "user_id" not in session or session["user_id"] is None:
+        return {"error": "Unauthorized"}, 401
+
+    paginated = "limit" in request.args or "after" in request.args
+    if paginated:
+        limit, after, error = keyset_args(request.args)
+        if error:
+            return {"error": error}, 422
+
+    serializer, error = requested_fields(recipe_serializer, request.args)
+    if error:
+        return {"error": error}, 422
+
+    etag = make_etag(await current_versions(db_session, "recipes", "users"), request.query_string)
+    if request.if_none_match.contains_weak(etag):
+        return not_modified(etag)
+
+    stmt = serializer.select(Recipe.id).order_by(Recipe.id)
+
+    if not paginated:
+        rows = await db_session.execute(stmt)
+        return serializer.dump_rows(rows), 200, etag_headers(etag)
+
+    rows = (await db_session.execute(stmt.where(Recipe.id > after).limit(limit + 1))).all()
+    has_more = len(rows) > limit
+
+    return {
+        "recipes": serializer.dump_rows(rows[:limit]),
+        "next_cursor": rows[limit - 1][-1] if has_more else None,
+    }, 200, etag_headers(etag)
+
+
+@application.route("/recipes", "POST")
+async def create_recipe(request, session, db_session):
+    """Allows a logged-in user to create a recipe."""
+    if "user_id" not in session:
+        return {"error": "Unauthorized"}, 401
+
+    fields, error = validate_recipe(request.get_json())
+    if error:
+        return {"error": error}, 422
+
+    recipe = Recipe(user_id=session["user_id"], **fields)
+
+    db_session.add(recipe)
+    await db_session.commit()
+    # Lazy loads can't run under asyncio, so load the author explicitly.
+    await db_session.refresh(recipe, ["user"])
+
+    return recipe_serializer.dump(recipe), 201
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Bytes and CPU per request for GET /recipes under each JSON and compression setting.
+
+    python benchmarks/compression.py --recipes 1000 --repeat 200
+
+Runs the real app against a throwaway SQLite file through the Flask test
+client, so the CPU time covers the query, serialization, JSON encoding and
+compression of one request.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import responses  # noqa: E402
+from config import create_app, db  # noqa: E402
+from models import Recipe, User  # noqa: E402
+
+WORDS = (
+    "preheat oven whisk eggs sugar fold flour butter pour tin bake skewer clean simmer "
+    "stir onions garlic brown season salt pepper chop herbs rest slice serve roast "
+    "knead dough proof shape glaze cool drain pasta toss sauce reduce heat cover"
+).split()
+
+
+def instructions(rng):
+    """About 300 characters of varied text, so compression ratios stay realistic."""
+    return " ".join(rng.choices(WORDS, k=45)).capitalize() + "."
+
+
+def build_app(path, recipe_count):
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+        "SESSION_BACKEND": "memory",
+        "RATE_LIMIT_BACKEND": "off",
+        "METRICS_ENABLED": False,
+        "HASHING_EXECUTOR": "inline",
+        "BCRYPT_LOG_ROUNDS": 4,
+    })
+    with app.app_context():
+        db.create_all()
+        user = User(username="bench")
+        user.set_password("bench")
+        db.session.add(user)
+        db.session.commit()
+        rng = random.Random(0)
+        db.session.execute(db.insert(Recipe), [
+            {
+                "title": f"Recipe {i}",
+                "instructions": instructions(rng),
+                "minutes_to_complete": 15 + i % 75,
+                "user_id": user.id,
+            }
+            for i in range(recipe_count)
+        ])
+        db.session.commit()
+    return app
+
+
+VARIANTS = [
+    # label, config, Accept-Encoding, use orjson
+    ("pretty json, identity", {"JSON_COMPACT": False}, None, False),
+    ("compact json, identity", {}, None, False),
+    ("compact orjson, identity", {}, None, True),
+    ("compact orjson, gzip 1", {"COMPRESS_LEVEL": 1}, "gzip", True),
+    ("compact orjson, gzip 6", {"COMPRESS_LEVEL": 6}, "gzip", True),
+    ("compact orjson, gzip 9", {"COMPRESS_LEVEL": 9}, "gzip", True),
+    ("compact orjson, brotli 4", {"COMPRESS_BROTLI_QUALITY": 4}, "br", True),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--path", default="/recipes?limit=100")
+    args = parser.parse_args()
+
+    orjson = responses.orjson
+    defaults = {"JSON_COMPACT": True, "COMPRESS_LEVEL": 1, "COMPRESS_BROTLI_QUALITY": 4}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, "bench.db"), args.recipes)
+        client = app.test_client()
+        client.post("/login", json={"username": "bench", "password": "bench"})
+
+        print(f"GET {args.path} with {args.recipes} recipes, {args.repeat} requests each:")
+        for label, config, encoding, use_orjson in VARIANTS:
+            if use_orjson and orjson is None:
+                print(f"  {label:<28} skipped (orjson not installed)")
+                continue
+            if encoding == "br" and responses.brotli is None:
+                print(f"  {label:<28} skipped (brotli not installed)")
+                continue
+
+            app.config.update(defaults, **config)
+            responses.orjson = orjson if use_orjson else None
+            headers = {"Accept-Encoding": encoding} if encoding else {}
+
+            client.get(args.path, headers=headers)
+            cpu = time.process_time()
+            for _ in range(args.repeat):
+                response = client.get(args.path, headers=headers)
+            cpu_ms = (time.process_time() - cpu) * 1000 / args.repeat
+            print(f"  {label:<28} {len(response.data):>9} bytes  {cpu_ms:>7.2f} ms CPU/request")
+
+        responses.orjson = orjson
+        with app.app_context():
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
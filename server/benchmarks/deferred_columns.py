@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Row bytes and memory per request with User.bio and Recipe.instructions deferred or eager.
+
+    python benchmarks/deferred_columns.py --users 200 --recipes 20 --repeat 200
+
+Fills a throwaway SQLite file with long bios and instructions, then runs the
+ORM loads the resources make, once as they are (text columns deferred) and
+once with undefer_group(TEXT_COLUMNS), i.e. the previous eager behaviour.
+Row bytes are the sizes of the column values each load hydrated; memory is
+the tracemalloc peak of one warm load in a fresh session.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import inspect  # noqa: E402
+from sqlalchemy.orm import undefer_group  # noqa: E402
+
+from config import create_app, db  # noqa: E402
+from models import TEXT_COLUMNS, Recipe, User  # noqa: E402
+
+WORDS = (
+    "preheat oven whisk eggs sugar fold flour butter pour tin bake skewer clean simmer "
+    "stir onions garlic brown season salt pepper chop herbs rest slice serve roast "
+    "knead dough proof shape glaze cool drain pasta toss sauce reduce heat cover"
+).split()
+
+
+def text(rng, words):
+    return " ".join(rng.choices(WORDS, k=words)).capitalize() + "."
+
+
+def build_app(path, user_count, recipes_per_user):
+    app = create_app({
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+        "SESSION_BACKEND": "memory",
+        "RATE_LIMIT_BACKEND": "off",
+        "METRICS_ENABLED": False,
+        "HASHING_EXECUTOR": "inline",
+        "BCRYPT_LOG_ROUNDS": 4,
+    })
+    rng = random.Random(0)
+    with app.app_context():
+        db.create_all()
+        template = User(username="template")
+        template.set_password("bench")
+        db.session.execute(db.insert(User), [
+            {
+                "username": f"user{i}",
+                "_password_hash": template._password_hash,
+                "bio": text(rng, 300),  # about 2 KB
+            }
+            for i in range(user_count)
+        ])
+        db.session.execute(db.insert(Recipe), [
+            {
+                "title": f"Recipe {i}",
+                "instructions": text(rng, 250),  # about 1.6 KB
+                "minutes_to_complete": 15 + i % 75,
+                "user_id": 1 + i % user_count,
+            }
+            for i in range(user_count * recipes_per_user)
+        ])
+        db.session.commit()
+    return app
+
+
+def login_lookup(options, rng, user_count):
+    """Login.post: one user by username, for the password check."""
+    username = f"user{rng.randrange(user_count)}"
+    return [User.query.options(*options).filter_by(username=username).first()]
+
+
+def user_recipes(options, rng, user_count):
+    """A user and their recipes, as walking User.recipes loads them."""
+    user = db.session.get(User, 1 + rng.randrange(user_count), options=options)
+    return [user, *db.session.scalars(db.select(Recipe).options(*options).filter_by(user_id=user.id))]
+
+
+def recent_recipes(options, rng, user_count):
+    """100 recipes and their authors, hydrated through r.user."""
+    recipes = db.session.scalars(
+        db.select(Recipe).options(*options).order_by(Recipe.id.desc()).limit(100)
+    ).all()
+    return recipes + [recipe.user for recipe in recipes]
+
+
+WORKLOADS = [
+    ("login lookup", login_lookup),
+    ("one user's recipes", user_recipes),
+    ("100 recipes + authors", recent_recipes),
+]
+
+
+def row_bytes(objects):
+    """Sizes of the column values actually hydrated into these objects."""
+    total = 0
+    for obj in {id(o): o for o in objects}.values():
+        state = inspect(obj)
+        for attr in state.mapper.column_attrs:
+            value = state.dict.get(attr.key)
+            if isinstance(value, str):
+                total += len(value.encode("utf-8"))
+            elif value is not None:
+                total += 8
+    return total
+
+
+def measure(app, workload, options, user_count, repeat):
+    rng = random.Random(1)
+    with app.app_context():
+        # Warm the statement cache so the peak covers only the load itself.
+        workload(options, rng, user_count)
+        db.session.remove()
+
+        tracemalloc.start()
+        loaded = workload(options, rng, user_count)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        size = row_bytes(loaded)
+        db.session.remove()
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            workload(options, rng, user_count)
+            db.session.remove()
+        ms = (time.perf_counter() - started) * 1000 / repeat
+    return size, peak, ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--recipes", type=int, default=20, help="recipes per user")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, "bench.db"), args.users, args.recipes)
+        print(f"{args.users} users, {args.recipes} recipes each, {args.repeat} requests each:")
+        for label, workload in WORKLOADS:
+            for mode, options in (("eager", [undefer_group(TEXT_COLUMNS)]), ("deferred", [])):
+                size, peak, ms = measure(app, workload, options, args.users, args.repeat)
+                print(
+                    f"  {label:<22} {mode:<9} {size:>9} row bytes  "
+                    f"{peak / 1024:>8.1f} KiB peak  {ms:>6.2f} ms/request"
+                )
+        with app.app_context():
+            db.engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
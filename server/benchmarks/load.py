@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""Load test for every API resource against a local threaded WSGI server.
+
+Seed the database first (``python seed.py --users 1000 --recipes 100000``),
+then from ``server/``:
+
+    python benchmarks/load.py --vus 16 --duration 30
+    python benchmarks/load.py --compare benchmarks/results/<earlier run>.json
+
+Each virtual user signs up, then loops through check_session, a page of
+recipes, a recipe creation, logout and login. Latency percentiles, requests
+per second, SQL statements per request and unexpected statuses are reported
+per route and saved as JSON so runs can be compared between commits.
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from http.cookies import SimpleCookie
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Every virtual user logs in from 127.0.0.1, which the per-IP login limit
+# would throttle within seconds. Set RATE_LIMIT_BACKEND to measure it anyway.
+os.environ.setdefault("RATE_LIMIT_BACKEND", "off")
+
+from sqlalchemy import event  # noqa: E402
+from werkzeug.serving import make_server  # noqa: E402
+
+from app import app  # noqa: E402
+from config import db  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+# Statuses each route answers when the scenario runs as intended; anything
+# else (a 401, 422 or 429 included) counts as an error.
+EXPECTED_STATUSES = {
+    "POST /signup": {201},
+    "GET /check_session": {200, 304},
+    "GET /recipes": {200, 304},
+    "POST /recipes": {201},
+    "DELETE /logout": {204},
+    "POST /login": {200},
+}
+
+INSTRUCTIONS = "Whisk everything together, rest for ten minutes, then bake until golden brown."
+
+
+class QueryCounter:
+    """WSGI middleware counting SQL statements issued while serving each request."""
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.counts = defaultdict(list)
+
+    def on_execute(self, *args):
+        if getattr(self.local, "count", None) is not None:
+            self.local.count += 1
+
+    def __call__(self, environ, start_response):
+        self.local.count = 0
+        try:
+            return list(self.wsgi_app(environ, start_response))
+        finally:
+            route = f"{environ['REQUEST_METHOD']} {environ['PATH_INFO']}"
+            with self.lock:
+                self.counts[route].append(self.local.count)
+            self.local.count = None
+
+
+class VirtualUser(threading.Thread):
+    def __init__(self, port, deadline, recipes_path, samples, lock):
+        super().__init__(daemon=True)
+        self.port = port
+        self.deadline = deadline
+        self.recipes_path = recipes_path
+        self.samples = samples
+        self.lock = lock
+        self.cookies = {}
+        self.username = f"vu-{uuid.uuid4().hex[:12]}"
+
+    def request(self, method, path, body=None):
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=60)
+        headers = {"Content-Type": "application/json"}
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+        payload = json.dumps(body) if body is not None else None
+
+        start = time.perf_counter()
+        conn.request(method, path, body=payload, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        elapsed = time.perf_counter() - start
+        conn.close()
+
+        # A cookie jar: responses set the session and the db_primary_until
+        # cookies independently, and an empty or expired one is a delete.
+        for set_cookie in response.msg.get_all("Set-Cookie") or ():
+            for name, morsel in SimpleCookie(set_cookie).items():
+                if morsel.value and morsel["max-age"] != "0":
+                    self.cookies[name] = morsel.value
+                else:
+                    self.cookies.pop(name, None)
+
+        route = f"{method} {path.split('?')[0]}"
+        with self.lock:
+            self.samples[route].append((elapsed, response.status))
+
+    def run(self):
+        credentials = {"username": self.username, "password": "load-test-password"}
+        self.request("POST", "/signup", credentials)
+        while time.monotonic() < self.deadline:
+            self.request("GET", "/check_session")
+            self.request("GET", self.recipes_path)
+            self.request("POST", "/recipes", {
+                "title": "Load test recipe",
+                "instructions": INSTRUCTIONS,
+                "minutes_to_complete": 30,
+            })
+            self.request("DELETE", "/logout")
+            self.request("POST", "/login", credentials)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(samples, query_counts, duration):
+    routes = {}
+    for route, entries in sorted(samples.items()):
+        latencies = sorted(elapsed * 1000 for elapsed, _ in entries)
+        queries = query_counts.get(route, [])
+        statuses = Counter(status for _, status in entries)
+        expected = EXPECTED_STATUSES.get(route, range(200, 400))
+        routes[route] = {
+            "requests": len(entries),
+            "errors": sum(n for status, n in statuses.items() if status not in expected),
+            "statuses": {str(status): n for status, n in sorted(statuses.items())},
+            "rps": round(len(entries) / duration, 2),
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+            "queries_per_request": round(sum(queries) / len(queries), 2) if queries else None,
+        }
+    return routes
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(routes, baseline=None):
+    header = f"{'route':<22}{'reqs':>7}{'errors':>8}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'q/req':>7}"
+    print(header)
+    print("-" * len(header))
+    for route, r in routes.items():
+        line = (
+            f"{route:<22}{r['requests']:>7}{r['errors']:>8}{r['rps']:>9.1f}{r['p50_ms']:>10.2f}"
+            f"{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}{r['queries_per_request'] or 0:>7.1f}"
+        )
+        old = (baseline or {}).get(route)
+        if old:
+            line += f"   p95 {(r['p95_ms'] - old['p95_ms']) / old['p95_ms'] * 100:+.0f}%"
+            line += f", rps {(r['rps'] - old['rps']) / old['rps'] * 100:+.0f}%"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vus", type=int, default=8, help="Concurrent virtual users.")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds to run.")
+    parser.add_argument("--recipes-path", default="/recipes?limit=20")
+    parser.add_argument("--output", help="Result file (default: results/<time>-<commit>.json).")
+    parser.add_argument("--compare", help="Earlier result file to diff against.")
+    args = parser.parse_args()
+
+    counter = QueryCounter(app.wsgi_app)
+    app.wsgi_app = counter
+    with app.app_context():
+        # The primary and the read pool or replicas that @read_only views use.
+        for engine in db.engines.values():
+            event.listen(engine, "before_cursor_execute", counter.on_execute)
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    samples, lock = defaultdict(list), threading.Lock()
+    start = time.monotonic()
+    vus = [
+        VirtualUser(server.port, start + args.duration, args.recipes_path, samples, lock)
+        for _ in range(args.vus)
+    ]
+    for vu in vus:
+        vu.start()
+    for vu in vus:
+        vu.join()
+    duration = time.monotonic() - start
+    server.shutdown()
+
+    commit = git_commit()
+    result = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {"vus": args.vus, "duration": args.duration, "recipes_path": args.recipes_path},
+        "routes": summarize(samples, counter.counts, duration),
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["routes"]
+    print_table(result["routes"], baseline)
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{commit or 'nogit'}.json")
+    with open(output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"Saved {output}")
+
+
+if __name__ == "__main__":
+    main()
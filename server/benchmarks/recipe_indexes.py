@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Query plans and timings for the recipes.user_id hot path, before and after
+the ix_recipes_user_id_id index.
+
+    python benchmarks/recipe_indexes.py --recipes 1000000 --users 10000
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+SCHEMA = """
+CREATE TABLE users (
+    id INTEGER NOT NULL PRIMARY KEY,
+    username VARCHAR NOT NULL UNIQUE,
+    _password_hash VARCHAR NOT NULL,
+    image_url VARCHAR,
+    bio VARCHAR
+);
+CREATE TABLE recipes (
+    id INTEGER NOT NULL PRIMARY KEY,
+    title VARCHAR NOT NULL,
+    instructions VARCHAR NOT NULL,
+    minutes_to_complete INTEGER NOT NULL,
+    user_id INTEGER NOT NULL REFERENCES users (id)
+);
+"""
+
+QUERIES = {
+    "recipes by user": (
+        "SELECT id, title, minutes_to_complete FROM recipes WHERE user_id = :user_id"
+    ),
+    "keyset page by user": (
+        "SELECT id, title, minutes_to_complete FROM recipes "
+        "WHERE user_id = :user_id AND id > :after ORDER BY id LIMIT 20"
+    ),
+    "cascade delete lookup": "SELECT id FROM recipes WHERE user_id = :user_id",
+}
+
+INSTRUCTIONS = "Whisk everything together, rest for ten minutes, then bake until golden."
+
+
+def seed(conn, users, recipes):
+    conn.executemany(
+        "INSERT INTO users (id, username, _password_hash) VALUES (?, ?, 'x')",
+        ((i, f"user{i}") for i in range(1, users + 1)),
+    )
+    conn.executemany(
+        "INSERT INTO recipes (title, instructions, minutes_to_complete, user_id) "
+        "VALUES (?, ?, ?, ?)",
+        (
+            (f"Recipe {i}", INSTRUCTIONS, random.randint(15, 90), random.randint(1, users))
+            for i in range(recipes)
+        ),
+    )
+    conn.commit()
+
+
+def run(conn, users, repeat):
+    sample = [random.randint(1, users) for _ in range(repeat)]
+    for name, sql in QUERIES.items():
+        params = {"user_id": sample[0], "after": 0}
+        plan = conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+        start = time.perf_counter()
+        for user_id in sample:
+            conn.execute(sql, {"user_id": user_id, "after": 0}).fetchall()
+        per_query_ms = (time.perf_counter() - start) * 1000 / repeat
+        print(f"  {name:<24} {per_query_ms:9.3f} ms/query   plan: {'; '.join(row[-1] for row in plan)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, "bench.db"))
+        conn.executescript(SCHEMA)
+
+        start = time.perf_counter()
+        seed(conn, args.users, args.recipes)
+        print(f"Seeded {args.users} users / {args.recipes} recipes in {time.perf_counter() - start:.1f}s")
+
+        print("Before:")
+        run(conn, args.users, args.repeat)
+
+        start = time.perf_counter()
+        conn.execute("CREATE INDEX ix_recipes_user_id_id ON recipes (user_id, id)")
+        conn.execute("ANALYZE")
+        print(f"Built ix_recipes_user_id_id in {time.perf_counter() - start:.1f}s")
+
+        print("After:")
+        run(conn, args.users, args.repeat)
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
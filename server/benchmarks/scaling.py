@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Throughput of the gunicorn deployment as the worker count grows.
+
+Seed the database first (``python seed.py --users 1000 --recipes 100000``),
+then from ``server/``:
+
+    python benchmarks/scaling.py --max-workers 8 --clients 32 --duration 15
+
+For each worker count from 1 to --max-workers, gunicorn is started with
+gunicorn.conf.py and hammered by client threads alternating
+``GET /check_session`` and ``GET /recipes?limit=20`` for the same logged-in
+user. Each client thread keeps one keep-alive connection.
+"""
+
+import argparse
+import http.client
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.cookies import SimpleCookie
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PATHS = ("/check_session", "/recipes?limit=20")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"gunicorn did not listen on {port} within {timeout}s")
+
+
+def log_in(port):
+    """Signs up a throwaway user and returns its session cookie."""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    conn.request(
+        "POST", "/signup",
+        body=json.dumps({"username": f"scale-{time.time_ns()}", "password": "scaling"}),
+        headers={"Content-Type": "application/json"},
+    )
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+    if response.status != 201:
+        raise RuntimeError(f"signup failed with {response.status}")
+
+    # Writes also set the db_primary_until cookie, so pick the session one out.
+    for set_cookie in response.msg.get_all("Set-Cookie") or ():
+        morsel = SimpleCookie(set_cookie).get("session")
+        if morsel is not None and morsel.value:
+            return f"session={morsel.value}"
+    raise RuntimeError("signup set no session cookie")
+
+
+def client(port, cookie, deadline, latencies, errors, lock):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    local = []
+    failed = 0
+    i = 0
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        conn.request("GET", PATHS[i % len(PATHS)], headers={"Cookie": cookie})
+        response = conn.getresponse()
+        response.read()
+        local.append(time.perf_counter() - start)
+        if not 200 <= response.status < 300:
+            failed += 1
+        i += 1
+    conn.close()
+    with lock:
+        latencies.extend(local)
+        errors.append(failed)
+
+
+def run(workers, args):
+    port = free_port()
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), WEB_THREADS=str(args.threads))
+    server = subprocess.Popen(
+        ["gunicorn", "-c", "gunicorn.conf.py", "--bind", f"127.0.0.1:{port}", "--log-level", "warning"],
+        cwd=SERVER_DIR, env=env,
+    )
+    try:
+        wait_for_port(port)
+        cookie = log_in(port)
+        latencies, errors, lock = [], [], threading.Lock()
+        deadline = time.monotonic() + args.duration
+        threads = [
+            threading.Thread(
+                target=client, args=(port, cookie, deadline, latencies, errors, lock)
+            )
+            for _ in range(args.clients)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait()
+
+    latencies.sort()
+    return {
+        "rps": len(latencies) / args.duration,
+        "errors": sum(errors),
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95)] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--threads", type=int, default=4, help="Threads per worker.")
+    parser.add_argument("--clients", type=int, default=32, help="Concurrent client threads.")
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds per worker count.")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs, {args.threads} threads per worker, {args.clients} clients:")
+    baseline = None
+    for workers in range(1, args.max_workers + 1):
+        result = run(workers, args)
+        baseline = baseline or result["rps"]
+        print(
+            f"  {workers:>2} workers  {result['rps']:>8.0f} req/s  ({result['rps'] / baseline:.2f}x)"
+            f"  p50 {result['p50_ms']:>7.2f} ms  p95 {result['p95_ms']:>7.2f} ms"
+            f"  non-2xx {result['errors']}"
+        )
+    sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Serializer against sqlalchemy_serializer's to_dict() on 10k recipes.
+
+    python benchmarks/serialization.py --recipes 10000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from sqlalchemy import ForeignKey, Integer, String, create_engine, select
+from sqlalchemy.orm import DeclarativeBase, Session, mapped_column, relationship
+from sqlalchemy_serializer import SerializerMixin
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from serializers import Serializer  # noqa: E402
+
+
+class Base(DeclarativeBase):
+    pass
+
+
+class User(Base, SerializerMixin):
+    __tablename__ = "users"
+
+    id = mapped_column(Integer, primary_key=True)
+    username = mapped_column(String, nullable=False)
+    recipes = relationship("Recipe", back_populates="user")
+
+
+class Recipe(Base, SerializerMixin):
+    __tablename__ = "recipes"
+
+    id = mapped_column(Integer, primary_key=True)
+    title = mapped_column(String, nullable=False)
+    instructions = mapped_column(String, nullable=False)
+    minutes_to_complete = mapped_column(Integer, nullable=False)
+    user_id = mapped_column(ForeignKey("users.id"), nullable=False)
+    user = relationship("User", back_populates="recipes", lazy="joined", innerjoin=True)
+
+
+FIELDS = ("id", "title", "instructions", "minutes_to_complete", {"user": ("id", "username")})
+ONLY = ("id", "title", "instructions", "minutes_to_complete", "user.id", "user.username")
+
+
+def timed(label, func, baseline=None):
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    speedup = f"  ({baseline / elapsed:.1f}x)" if baseline else ""
+    print(f"  {label:<36} {elapsed * 1000:9.1f} ms{speedup}")
+    return elapsed, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=10_000)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(User(id=i, username=f"user{i}") for i in range(1, 101))
+        session.add_all(
+            Recipe(
+                title=f"Recipe {i}",
+                instructions="Whisk everything together, rest, then bake until golden. " * 3,
+                minutes_to_complete=15 + i % 75,
+                user_id=1 + i % 100,
+            )
+            for i in range(args.recipes)
+        )
+        session.commit()
+
+    serializer = Serializer(Recipe, FIELDS)
+    print(f"Serializing {args.recipes} recipes with their authors:")
+
+    with Session(engine) as session:
+        recipes = session.scalars(select(Recipe)).unique().all()
+        baseline, expected = timed("to_dict(only=...) on ORM objects", lambda: [r.to_dict(only=ONLY) for r in recipes])
+        _, result = timed("Serializer.dump_many on ORM objects", lambda: serializer.dump_many(recipes), baseline)
+        assert result == expected
+
+    with Session(engine) as session:
+        baseline, _ = timed(
+            "query + hydrate + to_dict",
+            lambda: [r.to_dict(only=ONLY) for r in session.scalars(select(Recipe)).unique()],
+        )
+    with Session(engine) as session:
+        _, result = timed(
+            "query + Serializer.dump_rows",
+            lambda: serializer.dump_rows(session.execute(serializer.select())),
+            baseline,
+        )
+        assert sorted(result, key=lambda r: r["id"]) == sorted(expected, key=lambda r: r["id"])
+
+
+if __name__ == "__main__":
+    main()
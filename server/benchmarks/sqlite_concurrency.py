@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Read throughput while writes are in flight: SQLite defaults against the
+tuned engine profile (database.DEFAULT_SQLITE_PRAGMAS).
+
+    python benchmarks/sqlite_concurrency.py --readers 4 --duration 5
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from database import DEFAULT_SQLITE_PRAGMAS  # noqa: E402
+
+INSTRUCTIONS = "Whisk everything together, rest for ten minutes, then bake until golden."
+
+
+def connect(path, pragmas):
+    # timeout=0 mirrors a connection without busy_timeout unless the profile sets one.
+    conn = sqlite3.connect(path, timeout=0, isolation_level=None, check_same_thread=False)
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+
+def prepare(path, recipes):
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE recipes (id INTEGER PRIMARY KEY, title VARCHAR NOT NULL, "
+        "instructions VARCHAR NOT NULL, minutes_to_complete INTEGER NOT NULL, user_id INTEGER NOT NULL)"
+    )
+    conn.executemany(
+        "INSERT INTO recipes (title, instructions, minutes_to_complete, user_id) VALUES (?, ?, ?, ?)",
+        ((f"Recipe {i}", INSTRUCTIONS, 30, i % 100 + 1) for i in range(recipes)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def run(profile, pragmas, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        prepare(path, args.recipes)
+        stop = time.monotonic() + args.duration
+        counts = {"reads": 0, "read_errors": 0, "writes": 0, "write_errors": 0}
+        lock = threading.Lock()
+
+        def writer(conn):
+            while time.monotonic() < stop:
+                try:
+                    conn.execute("BEGIN IMMEDIATE")
+                    for _ in range(50):
+                        conn.execute(
+                            "INSERT INTO recipes (title, instructions, minutes_to_complete, user_id) "
+                            "VALUES ('New', ?, 30, 1)",
+                            (INSTRUCTIONS,),
+                        )
+                    conn.execute("COMMIT")
+                    key = "writes"
+                except sqlite3.OperationalError:
+                    if conn.in_transaction:
+                        conn.execute("ROLLBACK")
+                    key = "write_errors"
+                with lock:
+                    counts[key] += 1
+
+        def reader(conn):
+            while time.monotonic() < stop:
+                try:
+                    conn.execute(
+                        "SELECT id, title, minutes_to_complete FROM recipes "
+                        "WHERE id > ? ORDER BY id LIMIT 20",
+                        (counts["reads"] % args.recipes,),
+                    ).fetchall()
+                    key = "reads"
+                except sqlite3.OperationalError:
+                    key = "read_errors"
+                with lock:
+                    counts[key] += 1
+
+        threads = [threading.Thread(target=writer, args=(connect(path, pragmas),))]
+        threads += [
+            threading.Thread(target=reader, args=(connect(path, pragmas),))
+            for _ in range(args.readers)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        print(
+            f"  {profile:<8} reads/s {counts['reads'] / args.duration:10.0f}"
+            f"   read errors {counts['read_errors']:7d}"
+            f"   write txns/s {counts['writes'] / args.duration:8.0f}"
+            f"   write errors {counts['write_errors']:6d}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--recipes", type=int, default=100_000)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{args.readers} readers and 1 writer (50-row transactions) for {args.duration}s:")
+    run("default", {}, args)
+    run("tuned", DEFAULT_SQLITE_PRAGMAS, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import time
+
+import bcrypt
+import click
+from flask import current_app
+
+from database import sync_sqlite_replica
+
+
+@click.command("calibrate-bcrypt")
+@click.option("--budget-ms", default=250, show_default=True, help="Latency budget for one hash.")
+@click.option("--min-rounds", default=10, show_default=True)
+@click.option("--max-rounds", default=16, show_default=True)
+def calibrate_bcrypt(budget_ms, min_rounds, max_rounds):
+    """Picks the highest bcrypt cost that hashes within the latency budget."""
+    password = b"calibration-password"
+    chosen = min_rounds
+
+    for rounds in range(min_rounds, max_rounds + 1):
+        start = time.perf_counter()
+        bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        click.echo(f"rounds={rounds}: {elapsed_ms:.1f} ms")
+        if elapsed_ms > budget_ms:
+            break
+        chosen = rounds
+
+    click.echo(f"BCRYPT_LOG_ROUNDS={chosen}")
+
+
+@click.command("rebuild-stats")
+def rebuild_stats():
+    """Recomputes the recipe stats rollups and user counters from scratch."""
+    # models imports config, which imports this module.
+    from models import REBUILD_ROLLUPS, bump_table_versions
+
+    db = current_app.extensions["sqlalchemy"]
+    start = time.perf_counter()
+    with db.engine.begin() as connection:
+        for statement in REBUILD_ROLLUPS:
+            connection.execute(statement)
+        bump_table_versions(connection, {"users", "recipes"})
+    click.echo(f"Rebuilt rollups in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+@click.group("sessions")
+def sessions_cli():
+    """Manages server-side sessions."""
+
+
+@sessions_cli.command("sweep")
+def sweep_sessions():
+    """Deletes every expired session."""
+    removed = current_app.session_interface.store.sweep()
+    click.echo(f"Removed {removed} expired sessions.")
+
+
+@sessions_cli.command("revoke")
+@click.argument("user_id", type=int)
+def revoke_sessions(user_id):
+    """Logs a user out everywhere by deleting all of their sessions."""
+    removed = current_app.session_interface.store.revoke_user(user_id)
+    click.echo(f"Revoked {removed} sessions for user {user_id}.")
+
+
+@click.group("replicas")
+def replicas_cli():
+    """Manages local SQLite read replicas."""
+
+
+@replicas_cli.command("sync")
+@click.option("--interval", type=float, help="Keep copying every INTERVAL seconds.")
+def sync_replicas(interval):
+    """Copies the primary SQLite database into every replica file."""
+    db = current_app.extensions["sqlalchemy"]
+    primary = db.engines[None].url.database
+    replicas = [
+        db.engines[name].url.database
+        for name in current_app.config["DB_READ_BINDS"]
+        if db.engines[name].url.database != primary
+    ]
+    if not replicas:
+        raise click.ClickException("No replicas configured; set DATABASE_REPLICA_URLS.")
+
+    while True:
+        start = time.perf_counter()
+        for replica in replicas:
+            sync_sqlite_replica(primary, replica)
+        click.echo(f"Synced {len(replicas)} replicas in {(time.perf_counter() - start) * 1000:.0f} ms")
+        if not interval:
+            return
+        time.sleep(interval)
@@ -1,3 +1,5 @@
+import os
+
 from flask import Flask
 from flask_bcrypt import Bcrypt
 from flask_migrate import Migrate
@@ -5,16 +7,79 @@ from flask_restful import Api
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy import MetaData
 
-app = Flask(__name__)
-app.secret_key = "supersecretkey"
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///app.db"
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-app.json.compact = False
+from commands import calibrate_bcrypt, rebuild_stats, replicas_cli, sessions_cli
+from database import RoutingSession, configure_binds, dispose_engines, init_engines
+from hashing import PasswordHasher
+from metrics import init_metrics
+from ratelimit import init_rate_limits
+from responses import init_responses
+from sessions import init_sessions
 
+# Extensions are created unbound so models and resources can import them
+# without building an app; create_app binds them.
 metadata = MetaData()
-db = SQLAlchemy(metadata=metadata)
-migrate = Migrate(app, db)
-db.init_app(app)
+db = SQLAlchemy(metadata=metadata, session_options={"class_": RoutingSession})
+migrate = Migrate()
+bcrypt = Bcrypt()
+hasher = PasswordHasher(bcrypt)
+
+
+def create_app(config=None):
+    """Builds the app from the environment, with ``config`` taking precedence."""
+    from resources import register_resources
+
+    app = Flask(__name__)
+    app.secret_key = os.environ.get("SECRET_KEY", "supersecretkey")
+    app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///app.db")
+    app.config["DATABASE_REPLICA_URLS"] = [
+        url for url in os.environ.get("DATABASE_REPLICA_URLS", "").split(",") if url
+    ]
+    app.config["DB_READ_POOL_SIZE"] = int(os.environ.get("DB_READ_POOL_SIZE", 10))
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.config["BCRYPT_LOG_ROUNDS"] = int(os.environ.get("BCRYPT_LOG_ROUNDS", 12))
+    app.config["HASHING_EXECUTOR"] = os.environ.get("HASHING_EXECUTOR", "process")
+    app.config["HASHING_WORKERS"] = int(os.environ.get("HASHING_WORKERS", os.cpu_count() or 1))
+    app.config["SESSION_BACKEND"] = os.environ.get("SESSION_BACKEND", "sqlite")
+    app.config["RATE_LIMIT_BACKEND"] = os.environ.get("RATE_LIMIT_BACKEND", "sqlite")
+    app.config.update(config or {})
+
+    # @read_only views read from these binds; with SQLite their connections
+    # are opened with query_only so they can never write.
+    configure_binds(
+        app,
+        app.config["SQLALCHEMY_DATABASE_URI"],
+        app.config["DATABASE_REPLICA_URLS"],
+        pool_size=app.config["DB_READ_POOL_SIZE"],
+    )
+    db.init_app(app)
+    migrate.init_app(app, db)
+    init_engines(app, db)
+
+    bcrypt.init_app(app)
+    hasher.init_app(app)
+    init_sessions(app)
+    init_rate_limits(app)
+
+    api = Api(app)
+    register_resources(api)
+    init_responses(app, api)
+    init_metrics(app, api)
+
+    app.cli.add_command(calibrate_bcrypt)
+    app.cli.add_command(rebuild_stats)
+    app.cli.add_command(sessions_cli)
+    app.cli.add_command(replicas_cli)
+    return app
+
 
-bcrypt = Bcrypt(app)
-api = Api(app)
+def reset_after_fork(app):
+    """Resets every pool a forked worker inherited from the preloading parent."""
+    with app.app_context():
+        dispose_engines(db)
+    hasher.reset_after_fork()
+    session_store = getattr(app.session_interface, "store", None)
+    if session_store is not None:
+        session_store.reset_after_fork()
+    login_limiter = app.extensions["login_limiter"]
+    if login_limiter is not None:
+        login_limiter.store.reset_after_fork()
@@ -0,0 +1,209 @@
+import random
+import sqlite3
+import threading
+import time
+from functools import wraps
+
+from flask import g, has_app_context, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, orm
+
+READ_BIND = "readonly"
+
+DEFAULT_SQLITE_PRAGMAS = {
+    # busy_timeout goes first so switching journal_mode can wait for a lock.
+    "busy_timeout": 5000,
+    # Readers no longer block the writer (and vice versa) in WAL mode, and
+    # NORMAL only fsyncs at checkpoints, which is safe with WAL.
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -65536,  # KiB, i.e. 64 MiB per connection
+    "mmap_size": 268435456,
+    "temp_store": "MEMORY",
+}
+
+
+def read_only(view):
+    """Routes a resource method's queries to a replica or the read-only pool."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.db_read_only = True
+        return view(*args, **kwargs)
+    return wrapper
+
+
+def configure_binds(app, primary_url, replica_urls, pool_size):
+    """Sets SQLALCHEMY_BINDS to one bind per replica URL.
+
+    Without replicas, reads use a second pool over the primary database.
+    """
+    if replica_urls:
+        read_binds = [f"replica{i}" for i in range(len(replica_urls))]
+    else:
+        read_binds, replica_urls = [READ_BIND], [primary_url]
+
+    app.config["SQLALCHEMY_BINDS"] = {
+        name: {"url": url, "pool_size": pool_size} for name, url in zip(read_binds, replica_urls)
+    }
+    app.config["DB_READ_BINDS"] = read_binds
+
+
+class RoutingSession(Session):
+    """Sends reads from @read_only views to a read bind, everything else to the primary.
+
+    Once a request has written, its later reads stay on the primary, and a
+    cookie keeps that client's reads there for DB_STICKY_SECONDS so it
+    reads its own writes while replicas catch up. All replica reads in one
+    request go to the same replica.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_app_context() and g.get("db_read_only"):
+            read_bind = self._read_bind()
+            if read_bind is not None:
+                return self._db.engines[read_bind]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _read_bind(self):
+        if g.get("db_wrote") or self.info.get("wrote"):
+            return None
+        if has_request_context():
+            sticky_until = request.cookies.get(self._db.sticky_cookie, type=float)
+            if sticky_until and sticky_until > time.time():
+                return None
+        if "db_read_bind" not in g:
+            g.db_read_bind = random.choice(self._db.read_binds) if self._db.read_binds else None
+        return g.db_read_bind
+
+
+def _mark_flush_wrote(session, flush_context):
+    session.info["wrote"] = True
+
+
+def _mark_bulk_wrote(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+def _remember_write(session):
+    if session.info.pop("wrote", False) and has_app_context():
+        g.db_wrote = True
+
+
+class WriteTrackingSession(orm.Session):
+    """Plain session that flags ``info["wrote"]`` on writes, as RoutingSession does.
+
+    For sessions outside Flask-SQLAlchemy, such as the async ones in asgi.py,
+    whose caller turns the flag into ``g.db_wrote``.
+    """
+
+
+event.listen(WriteTrackingSession, "after_flush", _mark_flush_wrote)
+event.listen(WriteTrackingSession, "do_orm_execute", _mark_bulk_wrote)
+
+
+class SQLiteFileStore:
+    """Base for stores kept in a local SQLite file that every worker process shares.
+
+    Each thread gets one autocommit connection in WAL mode, so a lookup is a
+    single statement. The connections are dropped in a forked worker, since
+    SQLite connections must not cross a fork.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def reset_after_fork(self):
+        self._local = threading.local()
+
+
+def sync_sqlite_replica(primary_path, replica_path):
+    """Copies the primary into a replica file with SQLite's online backup API.
+
+    The copy runs in one write transaction on the replica, so its readers
+    keep seeing the previous snapshot until it completes.
+    """
+    source = sqlite3.connect(primary_path)
+    target = sqlite3.connect(replica_path, timeout=30)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+def dispose_engines(db):
+    """Drops pooled connections inherited from the parent; call in a forked worker.
+
+    close=False leaves the sockets and file handles to the parent, which
+    still owns them.
+    """
+    for engine in db.engines.values():
+        engine.dispose(close=False)
+
+
+def sqlite_pragma_listener(pragmas):
+    """A "connect" listener applying ``pragmas`` to each new SQLite connection.
+
+    Used for the sync engines and for the async engine in asgi.py alike.
+    """
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+    return apply_pragmas
+
+
+def init_engines(app, db):
+    """Applies SQLITE_PRAGMAS to every SQLite connection, makes the read binds
+    query_only and sets up read-your-writes routing.
+
+    Pass an empty SQLITE_PRAGMAS to keep SQLite's defaults.
+    """
+    pragmas = app.config.setdefault("SQLITE_PRAGMAS", DEFAULT_SQLITE_PRAGMAS)
+    sticky_seconds = app.config.setdefault("DB_STICKY_SECONDS", 5)
+    db.sticky_cookie = app.config.setdefault("DB_STICKY_COOKIE", "db_primary_until")
+    db.read_binds = app.config.setdefault("DB_READ_BINDS", [])
+
+    apply_pragmas = sqlite_pragma_listener(pragmas)
+
+    def mark_query_only(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA query_only = ON")
+
+    # Listeners go on this app's own engines, so another app's pragmas (or a
+    # second create_app in the same process) never leak onto them.
+    with app.app_context():
+        for name, engine in db.engines.items():
+            if engine.dialect.name != "sqlite":
+                continue
+            if pragmas:
+                event.listen(engine, "connect", apply_pragmas)
+            if name in db.read_binds:
+                event.listen(engine, "connect", mark_query_only)
+
+    if not event.contains(RoutingSession, "after_commit", _remember_write):
+        event.listen(RoutingSession, "after_flush", _mark_flush_wrote)
+        event.listen(RoutingSession, "do_orm_execute", _mark_bulk_wrote)
+        event.listen(RoutingSession, "after_commit", _remember_write)
+
+    @app.after_request
+    def stick_to_primary(response):
+        if g.get("db_wrote") and sticky_seconds:
+            response.set_cookie(
+                db.sticky_cookie,
+                str(time.time() + sticky_seconds),
+                max_age=sticky_seconds,
+                httponly=True,
+            )
+        return response
@@ -0,0 +1,44 @@
+"""Production server settings. From server/:
+
+    gunicorn -c gunicorn.conf.py
+
+The app and models are imported once in the master and the workers are
+forked from it. ``kill -HUP <master pid>`` starts a fresh set of workers and
+lets the old ones finish their requests before exiting; the listening
+socket stays open throughout, so no connection is refused. Because the app
+is preloaded, new workers run the code the master loaded. To deploy new
+code, send USR2 (starts a new master), then WINCH and QUIT to the old one.
+
+Each worker hashes passwords in its own bcrypt process pool. Unless
+HASHING_WORKERS is set, the cores are split between the workers
+(cpu_count // workers, at least 1) so the pools together stay bounded by the
+core count instead of growing to cpu_count squared.
+"""
+
+import os
+
+wsgi_app = "app:app"
+bind = os.environ.get("BIND", "0.0.0.0:5555")
+cpus = os.cpu_count() or 1
+workers = int(os.environ.get("WEB_CONCURRENCY", cpus))
+worker_class = "gthread"
+threads = int(os.environ.get("WEB_THREADS", 4))
+preload_app = True
+graceful_timeout = int(os.environ.get("GRACEFUL_TIMEOUT", 30))
+keepalive = 5
+
+# Read by create_app, which runs after this file when the app is preloaded.
+os.environ.setdefault("HASHING_WORKERS", str(max(1, cpus // workers)))
+
+
+def post_fork(server, worker):
+    # Connections, thread-locals and locks from the master are not safe to
+    # share, so each worker opens its own.
+    from app import app
+    from config import reset_after_fork
+    reset_after_fork(app)
+
+
+def worker_exit(server, worker):
+    from config import hasher
+    hasher.shutdown(wait=False)
@@ -0,0 +1,166 @@
+import asyncio
+import functools
+import multiprocessing
+import os
+import secrets
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+class HashingBusy(Exception):
+    """Raised when the hashing queue is full and the caller should back off."""
+
+
+def hash_rounds(pw_hash):
+    """Returns the bcrypt cost encoded in a hash such as ``$2b$12$...``."""
+    return int(pw_hash.split("$")[2])
+
+
+def _call(bcrypt, method, *args):
+    """Runs a flask_bcrypt method inside a pool worker."""
+    return getattr(bcrypt, method)(*args)
+
+
+class PasswordHasher:
+    """Runs flask_bcrypt hashing on a bounded worker pool instead of the request thread.
+
+    HASHING_EXECUTOR selects "process" (default, sidesteps the GIL), "thread"
+    or "inline". At most HASHING_MAX_PENDING hashes may be queued or running;
+    callers wait up to HASHING_QUEUE_TIMEOUT seconds for a slot before
+    HashingBusy is raised. New hashes use the BCRYPT_LOG_ROUNDS cost.
+
+    A process pool is unusable once one of its processes dies (an OOM kill,
+    a segfault), so it is replaced; hashes lost with it raise HashingBusy.
+    """
+
+    def __init__(self, bcrypt, app=None):
+        self.bcrypt = bcrypt
+        self._executor = None
+        self._lock = threading.Lock()
+        self._dummy_hash = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.rounds = app.config.setdefault("BCRYPT_LOG_ROUNDS", 12)
+        self.kind = app.config.setdefault("HASHING_EXECUTOR", "process")
+        self.workers = app.config.setdefault("HASHING_WORKERS", os.cpu_count() or 1)
+        self.max_pending = app.config.setdefault("HASHING_MAX_PENDING", self.workers * 8)
+        self.queue_timeout = app.config.setdefault("HASHING_QUEUE_TIMEOUT", 1.0)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        app.extensions["password_hasher"] = self
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.kind == "process":
+                        # spawn avoids forking a process that already runs threads.
+                        self._executor = ProcessPoolExecutor(
+                            max_workers=self.workers,
+                            mp_context=multiprocessing.get_context("spawn"),
+                        )
+                    else:
+                        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def _discard_executor(self, executor):
+        """Drops a broken pool so the next call starts a fresh one."""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    def _submit(self, method, *args):
+        """Queues a call on the pool; the caller must already hold a slot."""
+        try:
+            executor = self._get_executor()
+            try:
+                future = executor.submit(_call, self.bcrypt, method, *args)
+            except BrokenProcessPool:
+                self._discard_executor(executor)
+                executor = self._get_executor()
+                future = executor.submit(_call, self.bcrypt, method, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(functools.partial(self._finished, executor))
+        return future
+
+    def _finished(self, executor, future):
+        self._slots.release()
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._discard_executor(executor)
+
+    def _run(self, method, *args):
+        if self.kind == "inline":
+            return _call(self.bcrypt, method, *args)
+
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise HashingBusy()
+        try:
+            return self._submit(method, *args).result()
+        except BrokenProcessPool:
+            raise HashingBusy() from None
+
+    async def _run_async(self, method, *args):
+        """Like _run, but waits for a slot and the result without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        if self.kind == "inline":
+            return await loop.run_in_executor(None, _call, self.bcrypt, method, *args)
+
+        acquire = functools.partial(self._slots.acquire, timeout=self.queue_timeout)
+        if not (self._slots.acquire(blocking=False) or await loop.run_in_executor(None, acquire)):
+            raise HashingBusy()
+        try:
+            return await asyncio.wrap_future(self._submit(method, *args))
+        except BrokenProcessPool:
+            raise HashingBusy() from None
+
+    def generate_password_hash(self, password):
+        return self._run("generate_password_hash", password).decode("utf-8")
+
+    def check_password_hash(self, pw_hash, password):
+        return self._run("check_password_hash", pw_hash, password)
+
+    async def generate_password_hash_async(self, password):
+        return (await self._run_async("generate_password_hash", password)).decode("utf-8")
+
+    async def check_password_hash_async(self, pw_hash, password):
+        return await self._run_async("check_password_hash", pw_hash, password)
+
+    def _get_dummy_hash(self):
+        if self._dummy_hash is None:
+            self._dummy_hash = self.generate_password_hash(secrets.token_urlsafe(16))
+        return self._dummy_hash
+
+    def check_dummy(self, password):
+        """Spends one hash check's worth of CPU and returns False.
+
+        Logins for unknown usernames call this so they take as long as a
+        wrong password for a real one.
+        """
+        self.check_password_hash(self._get_dummy_hash(), password)
+        return False
+
+    async def check_dummy_async(self, password):
+        if self._dummy_hash is None:
+            self._dummy_hash = await self.generate_password_hash_async(secrets.token_urlsafe(16))
+        await self.check_password_hash_async(self._dummy_hash, password)
+        return False
+
+    def needs_rehash(self, pw_hash):
+        return hash_rounds(pw_hash) != self.rounds
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+    def reset_after_fork(self):
+        """Forgets the parent's pool and locks; call in a freshly forked worker."""
+        self._executor = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_pending)
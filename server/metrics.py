@@ -0,0 +1,160 @@
+import logging
+import threading
+import time
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from cache import user_cache
+
+logger = logging.getLogger("app.slow_queries")
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+STATEMENT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Prometheus-style cumulative histogram keyed by a label tuple."""
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * len(self.buckets), 0, 0.0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            series[1] += 1
+            series[2] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for labels, (counts, count, total) in sorted(self._series.items()):
+                label_str = ",".join(f'{k}="{v}"' for k, v in labels)
+                for bound, bucket_count in zip(self.buckets, counts):
+                    lines.append(f'{self.name}_bucket{{{label_str},le="{bound}"}} {bucket_count}')
+                lines.append(f'{self.name}_bucket{{{label_str},le="+Inf"}} {count}')
+                lines.append(f"{self.name}_count{{{label_str}}} {count}")
+                lines.append(f"{self.name}_sum{{{label_str}}} {total}")
+        return lines
+
+
+request_seconds = Histogram(
+    "http_request_duration_seconds", "Total time spent serving a request.", LATENCY_BUCKETS
+)
+db_seconds = Histogram(
+    "db_query_duration_seconds", "Time spent in SQL statements per request.", LATENCY_BUCKETS
+)
+db_statements = Histogram(
+    "db_statements_per_request", "SQL statements executed per request.", STATEMENT_BUCKETS
+)
+serialize_seconds = Histogram(
+    "response_serialization_seconds", "Time spent encoding response bodies.", LATENCY_BUCKETS
+)
+HISTOGRAMS = (request_seconds, db_seconds, db_statements, serialize_seconds)
+
+# Replaced from SLOW_QUERY_THRESHOLD_MS by init_metrics.
+_slow_query_threshold = 0.1
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context, which is dropped with the statement even
+    # when it fails; conn.info outlives the checkout and would leak entries.
+    context.metrics_query_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context.metrics_query_start
+    if has_request_context():
+        g.db_statements = g.get("db_statements", 0) + 1
+        g.db_seconds = g.get("db_seconds", 0.0) + elapsed
+
+    if elapsed >= _slow_query_threshold:
+        # Only the shape of the parameters is logged; values may hold secrets.
+        count = len(parameters) if isinstance(parameters, (list, tuple, dict)) else 0
+        logger.warning(
+            "slow query (%.1f ms, %s, %d params redacted): %s",
+            elapsed * 1000,
+            "executemany" if executemany else "execute",
+            count,
+            " ".join(statement.split()),
+        )
+
+
+def _start_timer():
+    g.request_start = time.perf_counter()
+
+
+def _record_request(response):
+    start = g.get("request_start")
+    if start is None:
+        return response
+    labels = (
+        ("endpoint", request.url_rule.rule if request.url_rule else "unmatched"),
+        ("method", request.method),
+    )
+    request_seconds.observe(labels, time.perf_counter() - start)
+    db_seconds.observe(labels, g.get("db_seconds", 0.0))
+    db_statements.observe(labels, g.get("db_statements", 0))
+    serialize_seconds.observe(labels, g.get("serialize_seconds", 0.0))
+    return response
+
+
+def _timed_representation(represent):
+    def output(data, code, headers=None):
+        start = time.perf_counter()
+        response = represent(data, code, headers)
+        if has_request_context():
+            g.serialize_seconds = g.get("serialize_seconds", 0.0) + time.perf_counter() - start
+        return response
+    return output
+
+
+def render_metrics():
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+
+    stats = user_cache.stats()
+    lines += [
+        "# HELP user_cache_hits_total CheckSession profile cache hits.",
+        "# TYPE user_cache_hits_total counter",
+        f"user_cache_hits_total {stats['hits']}",
+        "# HELP user_cache_misses_total CheckSession profile cache misses.",
+        "# TYPE user_cache_misses_total counter",
+        f"user_cache_misses_total {stats['misses']}",
+    ]
+    return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
+
+
+def init_metrics(app, api):
+    """Hooks request timing, SQL timing and JSON encoding time into /metrics.
+
+    Statements slower than SLOW_QUERY_THRESHOLD_MS are logged with their
+    parameters redacted. Figures are per process.
+    """
+    global _slow_query_threshold
+    _slow_query_threshold = app.config.setdefault("SLOW_QUERY_THRESHOLD_MS", 100) / 1000
+
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+    app.before_request(_start_timer)
+    app.after_request(_record_request)
+
+    for mediatype, represent in list(api.representations.items()):
+        api.representations[mediatype] = _timed_representation(represent)
+
+    if app.config.setdefault("METRICS_ENABLED", True):
+        app.add_url_rule("/metrics", "metrics", render_metrics)
@@ -0,0 +1,27 @@
+"""Index recipes.user_id
+
+Revision ID: 3c9a1e7b2d40
+Revises: 85f3e6d6b1f2
+Create Date: 2026-10-18 09:12:41.503117
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9a1e7b2d40'
+down_revision = '85f3e6d6b1f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # (user_id, id) also serves plain user_id lookups as its leading column,
+    # so a separate single-column index would only cost extra writes.
+    with op.batch_alter_table('recipes', schema=None) as batch_op:
+        batch_op.create_index('ix_recipes_user_id_id', ['user_id', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('recipes', schema=None) as batch_op:
+        batch_op.drop_index('ix_recipes_user_id_id')
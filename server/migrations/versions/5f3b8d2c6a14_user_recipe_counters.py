@@ -0,0 +1,112 @@
+"""User recipe counters
+
+Revision ID: 5f3b8d2c6a14
+Revises: e21d6c0f9a37
+Create Date: 2026-10-18 14:06:41.302517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f3b8d2c6a14'
+down_revision = 'e21d6c0f9a37'
+branch_labels = None
+depends_on = None
+
+
+# users.recipe_count and users.total_minutes are kept current by triggers on
+# recipes, so they also cover bulk inserts and cascade deletes. As with the
+# FTS triggers, a batch_alter_table on recipes drops these in SQLite and
+# must recreate them.
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER recipes_counters_ai AFTER INSERT ON recipes BEGIN
+        UPDATE users SET recipe_count = recipe_count + 1,
+            total_minutes = total_minutes + new.minutes_to_complete
+        WHERE id = new.user_id;
+    END
+    """,
+    """
+    CREATE TRIGGER recipes_counters_ad AFTER DELETE ON recipes BEGIN
+        UPDATE users SET recipe_count = recipe_count - 1,
+            total_minutes = total_minutes - old.minutes_to_complete
+        WHERE id = old.user_id;
+    END
+    """,
+    """
+    CREATE TRIGGER recipes_counters_au AFTER UPDATE OF user_id, minutes_to_complete ON recipes
+    BEGIN
+        UPDATE users SET recipe_count = recipe_count - 1,
+            total_minutes = total_minutes - old.minutes_to_complete
+        WHERE id = old.user_id;
+        UPDATE users SET recipe_count = recipe_count + 1,
+            total_minutes = total_minutes + new.minutes_to_complete
+        WHERE id = new.user_id;
+    END
+    """,
+]
+
+POSTGRESQL_TRIGGERS = [
+    """
+    CREATE FUNCTION recipes_counters() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            UPDATE users SET recipe_count = recipe_count - 1,
+                total_minutes = total_minutes - OLD.minutes_to_complete
+            WHERE id = OLD.user_id;
+        END IF;
+        IF TG_OP IN ('UPDATE', 'INSERT') THEN
+            UPDATE users SET recipe_count = recipe_count + 1,
+                total_minutes = total_minutes + NEW.minutes_to_complete
+            WHERE id = NEW.user_id;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER recipes_counters
+    AFTER INSERT OR DELETE OR UPDATE OF user_id, minutes_to_complete ON recipes
+    FOR EACH ROW EXECUTE FUNCTION recipes_counters()
+    """,
+]
+
+BACKFILL = """
+    UPDATE users SET
+        recipe_count = (SELECT COUNT(*) FROM recipes WHERE recipes.user_id = users.id),
+        total_minutes = (
+            SELECT COALESCE(SUM(minutes_to_complete), 0) FROM recipes
+            WHERE recipes.user_id = users.id
+        )
+"""
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('recipe_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('total_minutes', sa.Integer(), server_default='0', nullable=False))
+    # ### end Alembic commands ###
+
+    dialect = op.get_bind().dialect.name
+    for trigger in {'sqlite': SQLITE_TRIGGERS, 'postgresql': POSTGRESQL_TRIGGERS}.get(dialect, []):
+        op.execute(trigger)
+    op.execute(BACKFILL)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for name in ('recipes_counters_au', 'recipes_counters_ad', 'recipes_counters_ai'):
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    elif dialect == 'postgresql':
+        op.execute("DROP TRIGGER IF EXISTS recipes_counters ON recipes")
+        op.execute("DROP FUNCTION IF EXISTS recipes_counters()")
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('total_minutes')
+        batch_op.drop_column('recipe_count')
+    # ### end Alembic commands ###
@@ -0,0 +1,108 @@
+"""Recipe stats rollups
+
+Revision ID: 9a7c4e1f3b26
+Revises: 5f3b8d2c6a14
+Create Date: 2026-10-18 15:12:09.648230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a7c4e1f3b26'
+down_revision = '5f3b8d2c6a14'
+branch_labels = None
+depends_on = None
+
+
+# recipe_minutes_histogram holds one row per distinct minutes_to_complete,
+# kept current by triggers in the same transaction as every recipe write.
+# As with the FTS triggers, a batch_alter_table on recipes drops these in
+# SQLite and must recreate them.
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER recipes_histogram_ai AFTER INSERT ON recipes BEGIN
+        INSERT INTO recipe_minutes_histogram (minutes, recipe_count)
+        VALUES (new.minutes_to_complete, 1)
+        ON CONFLICT (minutes) DO UPDATE SET recipe_count = recipe_count + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER recipes_histogram_ad AFTER DELETE ON recipes BEGIN
+        UPDATE recipe_minutes_histogram SET recipe_count = recipe_count - 1
+        WHERE minutes = old.minutes_to_complete;
+    END
+    """,
+    """
+    CREATE TRIGGER recipes_histogram_au AFTER UPDATE OF minutes_to_complete ON recipes BEGIN
+        UPDATE recipe_minutes_histogram SET recipe_count = recipe_count - 1
+        WHERE minutes = old.minutes_to_complete;
+        INSERT INTO recipe_minutes_histogram (minutes, recipe_count)
+        VALUES (new.minutes_to_complete, 1)
+        ON CONFLICT (minutes) DO UPDATE SET recipe_count = recipe_count + 1;
+    END
+    """,
+]
+
+POSTGRESQL_TRIGGERS = [
+    """
+    CREATE FUNCTION recipes_histogram() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            UPDATE recipe_minutes_histogram SET recipe_count = recipe_count - 1
+            WHERE minutes = OLD.minutes_to_complete;
+        END IF;
+        IF TG_OP IN ('UPDATE', 'INSERT') THEN
+            INSERT INTO recipe_minutes_histogram (minutes, recipe_count)
+            VALUES (NEW.minutes_to_complete, 1)
+            ON CONFLICT (minutes) DO UPDATE
+            SET recipe_count = recipe_minutes_histogram.recipe_count + 1;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER recipes_histogram
+    AFTER INSERT OR DELETE OR UPDATE OF minutes_to_complete ON recipes
+    FOR EACH ROW EXECUTE FUNCTION recipes_histogram()
+    """,
+]
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('recipe_minutes_histogram',
+    sa.Column('minutes', sa.Integer(), nullable=False),
+    sa.Column('recipe_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('minutes')
+    )
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('ix_users_recipe_count', ['recipe_count'], unique=False)
+    # ### end Alembic commands ###
+
+    dialect = op.get_bind().dialect.name
+    for trigger in {'sqlite': SQLITE_TRIGGERS, 'postgresql': POSTGRESQL_TRIGGERS}.get(dialect, []):
+        op.execute(trigger)
+    op.execute(
+        "INSERT INTO recipe_minutes_histogram (minutes, recipe_count) "
+        "SELECT minutes_to_complete, COUNT(*) FROM recipes GROUP BY minutes_to_complete"
+    )
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for name in ('recipes_histogram_au', 'recipes_histogram_ad', 'recipes_histogram_ai'):
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    elif dialect == 'postgresql':
+        op.execute("DROP TRIGGER IF EXISTS recipes_histogram ON recipes")
+        op.execute("DROP FUNCTION IF EXISTS recipes_histogram()")
+
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_recipe_count')
+
+    op.drop_table('recipe_minutes_histogram')
+    # ### end Alembic commands ###
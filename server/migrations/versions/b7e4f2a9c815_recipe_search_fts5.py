@@ -0,0 +1,66 @@
+"""Recipe full-text search index
+
+Revision ID: b7e4f2a9c815
+Revises: 3c9a1e7b2d40
+Create Date: 2026-10-18 10:02:17.884392
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e4f2a9c815'
+down_revision = '3c9a1e7b2d40'
+branch_labels = None
+depends_on = None
+
+
+# recipes_fts is an external-content FTS5 table: it stores only the index and
+# reads title/instructions back from recipes, kept in sync by the triggers.
+# Note that batch_alter_table on recipes recreates the table in SQLite and
+# drops these triggers, so such migrations must recreate them.
+TRIGGERS = [
+    """
+    CREATE TRIGGER recipes_fts_ai AFTER INSERT ON recipes BEGIN
+        INSERT INTO recipes_fts (rowid, title, instructions)
+        VALUES (new.id, new.title, new.instructions);
+    END
+    """,
+    """
+    CREATE TRIGGER recipes_fts_ad AFTER DELETE ON recipes BEGIN
+        INSERT INTO recipes_fts (recipes_fts, rowid, title, instructions)
+        VALUES ('delete', old.id, old.title, old.instructions);
+    END
+    """,
+    """
+    CREATE TRIGGER recipes_fts_au AFTER UPDATE OF title, instructions ON recipes BEGIN
+        INSERT INTO recipes_fts (recipes_fts, rowid, title, instructions)
+        VALUES ('delete', old.id, old.title, old.instructions);
+        INSERT INTO recipes_fts (rowid, title, instructions)
+        VALUES (new.id, new.title, new.instructions);
+    END
+    """,
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute(
+        "CREATE VIRTUAL TABLE recipes_fts USING fts5("
+        "title, instructions, content='recipes', content_rowid='id', "
+        "tokenize='porter unicode61')"
+    )
+    for trigger in TRIGGERS:
+        op.execute(trigger)
+    op.execute("INSERT INTO recipes_fts (recipes_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    for name in ('recipes_fts_au', 'recipes_fts_ad', 'recipes_fts_ai'):
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+    op.execute("DROP TABLE IF EXISTS recipes_fts")
@@ -1,45 +1,73 @@
-from sqlalchemy.orm import validates
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session, deferred, validates
 from sqlalchemy.ext.hybrid import hybrid_property
-from sqlalchemy_serializer import SerializerMixin
-from config import db, bcrypt
+from cache import user_cache
+from config import db, hasher
+from serializers import Serializer
 
-class User(db.Model, SerializerMixin):
+# Deferred group of the unbounded text columns. Plain loads leave them out;
+# a query whose response includes them passes undefer_group(TEXT_COLUMNS).
+TEXT_COLUMNS = "text"
+
+
+class User(db.Model):
     __tablename__ = "users"
 
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String, unique=True, nullable=False)
     _password_hash = db.Column(db.String, nullable=False)
     image_url = db.Column(db.String)
-    bio = db.Column(db.String)
+    bio = deferred(db.Column(db.String), group=TEXT_COLUMNS)
+    # Maintained by triggers on recipes (migration 5f3b8d2c6a14), so showing
+    # them never loads User.recipes.
+    recipe_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    total_minutes = db.Column(db.Integer, nullable=False, default=0, server_default="0")
 
     recipes = db.relationship("Recipe", back_populates="user", lazy=True, cascade="all, delete")
 
-    serialize_rules = ("-recipes.user",)
+    # Serves the top authors list in /recipes/stats.
+    __table_args__ = (db.Index("ix_users_recipe_count", "recipe_count"),)
 
     def set_password(self, password):
         """Hashes the password before storing it."""
-        self._password_hash = bcrypt.generate_password_hash(password).decode("utf-8")
+        self._password_hash = hasher.generate_password_hash(password)
 
     def check_password(self, password):
         """Checks if a given password matches the stored hashed password."""
-        return bcrypt.check_password_hash(self._password_hash, password)
+        return hasher.check_password_hash(self._password_hash, password)
+
+    async def set_password_async(self, password):
+        """Like set_password, for async handlers."""
+        self._password_hash = await hasher.generate_password_hash_async(password)
+
+    async def check_password_async(self, password):
+        """Like check_password, for async handlers."""
+        return await hasher.check_password_hash_async(self._password_hash, password)
+
+    def needs_rehash(self):
+        """Checks if the stored hash was made with a different bcrypt cost."""
+        return hasher.needs_rehash(self._password_hash)
 
     def authenticate(self, password):  # ✅ Fix: Added `authenticate()`
         """Authenticate user by checking password."""
         return self.check_password(password)
     
 
-class Recipe(db.Model, SerializerMixin):
+class Recipe(db.Model):
     __tablename__ = "recipes"
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String, nullable=False)
-    instructions = db.Column(db.String, nullable=False)
+    instructions = deferred(db.Column(db.String, nullable=False), group=TEXT_COLUMNS)
     minutes_to_complete = db.Column(db.Integer, nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)  # ✅ Ensuring `user_id` is NOT NULL
 
     user = db.relationship("User", back_populates="recipes")
 
+    # Serves "recipes by user" lookups, User.recipes, the cascade delete and
+    # keyset pages over one user's recipes.
+    __table_args__ = (db.Index("ix_recipes_user_id_id", "user_id", "id"),)
+
     @validates("title")
     def validate_title(self, key, title):
         if not title:
@@ -59,3 +87,123 @@ class Recipe(db.Model, SerializerMixin):
         return user_id  # ✅ Ensuring every recipe has a valid user_id
 
 
+user_serializer = Serializer(User, ("id", "username", "image_url", "bio"))
+user_profile_serializer = Serializer(
+    User, ("id", "username", "image_url", "bio", "recipe_count", "total_minutes")
+)
+recipe_serializer = Serializer(
+    Recipe,
+    ("id", "title", "instructions", "minutes_to_complete", {"user": ("id", "username")}),
+)
+
+
+class TableVersion(db.Model):
+    """Per-table change counter, bumped in the same transaction as every write.
+
+    Resources build ETags from these counters so a conditional GET can be
+    answered with one primary-key lookup instead of the full query.
+    """
+
+    __tablename__ = "table_versions"
+
+    name = db.Column(db.String, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    @classmethod
+    def current(cls, *names):
+        rows = db.session.execute(
+            db.select(cls.name, cls.version).where(cls.name.in_(names))
+        ).all()
+        versions = dict(rows)
+        return tuple(versions.get(name, 0) for name in names)
+
+
+class RecipeMinutes(db.Model):
+    """How many recipes take each number of minutes, maintained by triggers on recipes.
+
+    It has one row per distinct minutes_to_complete, so recipe stats are
+    computed from a few hundred rows however many recipes there are.
+    """
+
+    __tablename__ = "recipe_minutes_histogram"
+
+    minutes = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    recipe_count = db.Column(db.Integer, nullable=False)
+
+
+# Recomputes every trigger-maintained rollup from recipes, for rows written
+# with the triggers off.
+REBUILD_ROLLUPS = (
+    text(
+        "UPDATE users SET "
+        "recipe_count = (SELECT COUNT(*) FROM recipes WHERE recipes.user_id = users.id), "
+        "total_minutes = (SELECT COALESCE(SUM(minutes_to_complete), 0) FROM recipes "
+        "WHERE recipes.user_id = users.id)"
+    ),
+    text("DELETE FROM recipe_minutes_histogram"),
+    text(
+        "INSERT INTO recipe_minutes_histogram (minutes, recipe_count) "
+        "SELECT minutes_to_complete, COUNT(*) FROM recipes GROUP BY minutes_to_complete"
+    ),
+)
+
+
+VERSIONED_TABLES = frozenset({"users", "recipes"})
+
+BUMP_VERSION = text(
+    "INSERT INTO table_versions (name, version) VALUES (:name, 1) "
+    "ON CONFLICT (name) DO UPDATE SET version = table_versions.version + 1"
+)
+
+
+def bump_table_versions(connection, names):
+    """Bumps the version of each versioned table in ``names`` on ``connection``."""
+    for name in sorted(VERSIONED_TABLES.intersection(names)):
+        connection.execute(BUMP_VERSION, {"name": name})
+
+
+@event.listens_for(Session, "after_flush")
+def bump_flushed_tables(session, flush_context):
+    touched = {
+        obj.__tablename__
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+    }
+    bump_table_versions(session.connection(), touched)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def bump_bulk_tables(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None:
+            bump_table_versions(orm_execute_state.session.connection(), {mapper.local_table.name})
+
+
+@event.listens_for(Session, "after_flush")
+def invalidate_flushed_users(session, flush_context):
+    """Drops cached profiles of users updated or deleted in this flush."""
+    stale = session.info.setdefault("stale_user_ids", set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            stale.add(obj.id)
+            user_cache.invalidate(obj.id)
+
+
+@event.listens_for(Session, "after_commit")
+def invalidate_committed_users(session):
+    """Drops them again once committed, in case a reader re-cached the old row."""
+    for user_id in session.info.pop("stale_user_ids", ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def forget_stale_users(session, previous_transaction):
+    session.info.pop("stale_user_ids", None)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def invalidate_bulk_users(orm_execute_state):
+    """Bulk UPDATE/DELETE on users can touch any row, so the whole cache goes."""
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and \
+            orm_execute_state.bind_mapper is User.__mapper__:
+        user_cache.clear()
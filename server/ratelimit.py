@@ -0,0 +1,139 @@
+import os
+import threading
+import time
+
+from database import SQLiteFileStore
+
+
+class MemoryBucketStore:
+    """Token buckets in a dict. Each process keeps its own, so the limits apply per worker."""
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, rate, now):
+        """Takes one token, returning 0 or the seconds until one is available."""
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+            if tokens < 1:
+                return (1 - tokens) / rate
+            self._buckets[key] = (tokens - 1, now)
+            return 0
+
+    def sweep(self, before):
+        with self._lock:
+            stale = [key for key, (_, updated_at) in self._buckets.items() if updated_at < before]
+            for key in stale:
+                del self._buckets[key]
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def reset_after_fork(self):
+        self._lock = threading.Lock()
+
+
+class SQLiteBucketStore(SQLiteFileStore):
+    """Token buckets all workers draw from, so a client can't multiply its limit.
+
+    Each attempt is a single upsert, so concurrent workers can't both take
+    the last token.
+    """
+
+    TAKE = (
+        "INSERT INTO buckets (key, tokens, updated_at) VALUES (:key, :capacity - 1, :now) "
+        "ON CONFLICT (key) DO UPDATE SET "
+        "tokens = MIN(:capacity, tokens + (:now - updated_at) * :rate) - 1, updated_at = :now "
+        "WHERE MIN(:capacity, tokens + (:now - updated_at) * :rate) >= 1"
+    )
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+
+    def take(self, key, capacity, rate, now):
+        """Takes one token, returning 0 or the seconds until one is available."""
+        params = {"key": key, "capacity": capacity, "rate": rate, "now": now}
+        if self._conn().execute(self.TAKE, params).rowcount:
+            return 0
+        tokens, updated_at = self._conn().execute(
+            "SELECT tokens, updated_at FROM buckets WHERE key = ?", (key,)
+        ).fetchone()
+        return (1 - min(capacity, tokens + (now - updated_at) * rate)) / rate
+
+    def sweep(self, before):
+        return self._conn().execute("DELETE FROM buckets WHERE updated_at < ?", (before,)).rowcount
+
+    def clear(self):
+        self._conn().execute("DELETE FROM buckets")
+
+
+class LoginLimiter:
+    """Token-bucket limits on login attempts per client IP and per username.
+
+    A bucket holds up to ``capacity`` attempts and refills at ``rate`` per
+    second. Buckets idle long enough to be full again are swept at most every
+    sweep_interval seconds.
+    """
+
+    def __init__(self, store, ip_bucket, username_bucket, sweep_interval=300):
+        self.store = store
+        self.ip_bucket = ip_bucket
+        self.username_bucket = username_bucket
+        self.sweep_interval = sweep_interval
+        self._next_sweep = time.monotonic() + sweep_interval
+        self._idle_after = max(capacity / rate for capacity, rate in (ip_bucket, username_bucket))
+
+    def check(self, ip, username):
+        """Counts an attempt, returning 0 or the seconds the client must wait.
+
+        The IP bucket is checked first so a sprayer that is already blocked
+        can't drain the buckets of the usernames it tries.
+        """
+        now = time.time()
+        retry_after = self.store.take(f"ip:{ip}", *self.ip_bucket, now)
+        if not retry_after and isinstance(username, str) and username:
+            retry_after = self.store.take(f"user:{username.lower()}", *self.username_bucket, now)
+        self._maybe_sweep(now)
+        return retry_after
+
+    def _maybe_sweep(self, now):
+        if time.monotonic() >= self._next_sweep:
+            self._next_sweep = time.monotonic() + self.sweep_interval
+            self.store.sweep(now - self._idle_after)
+
+
+def init_rate_limits(app):
+    """Installs the login limiter chosen by RATE_LIMIT_BACKEND as app.extensions["login_limiter"].
+
+    It is None when RATE_LIMIT_BACKEND is "off".
+
+    Behind a proxy, wrap the app in werkzeug's ProxyFix so the limit applies
+    to the client's address rather than the proxy's.
+    """
+    backend = app.config.setdefault("RATE_LIMIT_BACKEND", "sqlite")
+    ip_bucket = app.config.setdefault("LOGIN_RATE_LIMIT_IP", (20, 20 / 60))
+    username_bucket = app.config.setdefault("LOGIN_RATE_LIMIT_USERNAME", (10, 10 / 300))
+    app.extensions["login_limiter"] = None
+    if backend == "off":
+        return None
+
+    if backend == "memory":
+        store = MemoryBucketStore()
+    elif backend == "sqlite":
+        os.makedirs(app.instance_path, exist_ok=True)
+        store = SQLiteBucketStore(app.config.setdefault(
+            "RATE_LIMIT_SQLITE_PATH", os.path.join(app.instance_path, "ratelimit.db")
+        ))
+    else:
+        raise ValueError(f"Unknown RATE_LIMIT_BACKEND {backend!r}")
+
+    limiter = app.extensions["login_limiter"] = LoginLimiter(store, ip_bucket, username_bucket)
+    return limiter
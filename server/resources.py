@@ -0,0 +1,533 @@
+import hashlib
+import math
+import re
+
+from flask import Response, current_app, request, session, stream_with_context
+from flask_restful import Resource
+from sqlalchemy import case, column, func, insert, select, table, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import undefer_group
+from werkzeug.http import quote_etag
+from cache import user_cache
+from config import db, hasher
+from database import read_only
+from hashing import HashingBusy
+from models import (
+    TEXT_COLUMNS, User, Recipe, RecipeMinutes, TableVersion, recipe_serializer,
+    user_profile_serializer, user_serializer,
+)
+from responses import dumps
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+EXPORT_BATCH_SIZE = 1000
+MAX_BATCH_SIZE = 1000
+DEFAULT_TOP_AUTHORS = 10
+PERCENTILES = (50, 90, 95, 99)
+
+# External-content FTS5 index over recipes, created by migration b7e4f2a9c815.
+recipes_fts = table("recipes_fts", column("rowid"))
+
+BUSY_RESPONSE = ({"error": "Server busy, try again shortly."}, 503, {"Retry-After": "1"})
+
+
+def make_etag(*parts):
+    """Hashes the version counters and request inputs a response depends on."""
+    return hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+
+
+def etag_headers(etag):
+    # no-cache lets clients store the body but makes them revalidate each time.
+    return {"ETag": quote_etag(etag), "Cache-Control": "no-cache"}
+
+
+def too_many_attempts(retry_after):
+    return (
+        {"error": "Too many login attempts, try again later."},
+        429,
+        {"Retry-After": str(math.ceil(retry_after))},
+    )
+
+
+def valid_credentials(username, password):
+    """Both must be non-empty strings before they reach the limiter or the hasher."""
+    return isinstance(username, str) and isinstance(password, str) and bool(username and password)
+
+
+def not_modified(etag):
+    response = Response(status=304)
+    response.headers.update(etag_headers(etag))
+    return response
+
+
+def keyset_args(args):
+    """Reads limit and after from a query string, returning (limit, after, error)."""
+    try:
+        limit = int(args.get("limit", DEFAULT_PAGE_SIZE))
+        after = int(args.get("after", 0))
+    except ValueError:
+        return None, None, "limit and after must be integers."
+    if limit <= 0:
+        return None, None, "limit must be a positive integer."
+    return min(limit, MAX_PAGE_SIZE), after, None
+
+
+def requested_fields(serializer, args):
+    """Narrows serializer to the fields= query parameter, returning (serializer, error).
+
+    ``fields=id,title,user.username`` selects and serializes only those
+    columns, and drops joins no requested field needs.
+    """
+    fields = args.get("fields")
+    if fields is None:
+        return serializer, None
+    try:
+        return serializer.project([f.strip() for f in fields.split(",") if f.strip()]), None
+    except ValueError as e:
+        return None, str(e)
+
+
+def validate_recipe(data):
+    """Checks one recipe payload, returning (fields, None) or (None, error).
+
+    These are the rules the @validates hooks on Recipe enforce, checked up
+    front so bulk inserts that bypass the ORM stay just as strict.
+    """
+    if not isinstance(data, dict):
+        return None, "Recipe must be a JSON object."
+
+    title = data.get("title")
+    instructions = data.get("instructions")
+    minutes_to_complete = data.get("minutes_to_complete")
+
+    if not title or not isinstance(title, str):
+        return None, "Title is required."
+    if not isinstance(instructions, str) or len(instructions) < 50:
+        return None, "Instructions must be at least 50 characters long."
+    if not isinstance(minutes_to_complete, int) or isinstance(minutes_to_complete, bool) \
+            or minutes_to_complete <= 0:
+        return None, "Minutes to complete must be a positive integer."
+
+    return {
+        "title": title,
+        "instructions": instructions,
+        "minutes_to_complete": minutes_to_complete,
+    }, None
+
+
+def validate_signup(data):
+    """Checks a signup payload, returning (fields, None) or (None, error).
+
+    fields holds the User columns plus the plaintext ``password``.
+    """
+    if not isinstance(data, dict):
+        return None, "Signup must be a JSON object."
+
+    username = data.get("username")
+    password = data.get("password")
+    if not valid_credentials(username, password):
+        return None, "Username and password are required."
+    for key, label in (("image_url", "Image URL"), ("bio", "Bio")):
+        if not isinstance(data.get(key), (str, type(None))):
+            return None, f"{label} must be a string."
+
+    return {
+        "username": username,
+        "password": password,
+        "image_url": data.get("image_url"),
+        "bio": data.get("bio"),
+    }, None
+
+
+class Signup(Resource):
+    def post(self):
+        """Handles user registration."""
+        fields, error = validate_signup(request.get_json())
+        if error:
+            return {"error": error}, 422
+
+        try:
+            password = fields.pop("password")
+            user = User(**fields)
+            user.set_password(password)
+
+            db.session.add(user)
+            db.session.flush()
+            # Dumped before the commit expires the user, which would cost a
+            # refresh plus a second load for the deferred bio.
+            profile = user_serializer.dump(user)
+            db.session.commit()
+
+            session["user_id"] = user.id
+
+            return profile, 201
+        except IntegrityError:
+            db.session.rollback()
+            return {"error": "Username already exists."}, 422
+        except HashingBusy:
+            return BUSY_RESPONSE
+
+
+class CheckSession(Resource):
+    @read_only
+    def get(self):
+        """Checks if a user is logged in."""
+        user_id = session.get("user_id")
+        if user_id:
+            cached = user_cache.get(user_id)
+            if cached is None:
+                user = db.session.get(User, user_id, options=[undefer_group(TEXT_COLUMNS)])
+                if user is None:
+                    return {"error": "Unauthorized"}, 401
+                profile = user_serializer.dump(user)
+                # The ETag is derived from the profile itself, so a cache hit
+                # can be revalidated without touching the database.
+                cached = (profile, make_etag(profile))
+                user_cache.set(user_id, cached)
+
+            profile, etag = cached
+            if request.if_none_match.contains_weak(etag):
+                return not_modified(etag)
+            return profile, 200, etag_headers(etag)
+        return {"error": "Unauthorized"}, 401
+
+
+class Login(Resource):
+    def post(self):
+        """Handles user login."""
+        data = request.get_json()
+        username = data.get("username")
+        password = data.get("password")
+        if not valid_credentials(username, password):
+            return {"error": "Invalid credentials"}, 401
+
+        # Checked before any query or hash, so a blocked client costs almost nothing.
+        limiter = current_app.extensions["login_limiter"]
+        retry_after = limiter.check(request.remote_addr, username) if limiter else 0
+        if retry_after:
+            return too_many_attempts(retry_after)
+
+        user = User.query.filter_by(username=username).first()
+        try:
+            if user is None:
+                authenticated = hasher.check_dummy(password)
+            else:
+                authenticated = user.check_password(password)
+        except HashingBusy:
+            return BUSY_RESPONSE
+
+        if authenticated:
+            if user.needs_rehash():
+                # Upgrade (or downgrade) the stored hash to the configured cost
+                # while the plaintext is at hand; a busy pool just defers it.
+                try:
+                    user.set_password(password)
+                    db.session.commit()
+                except HashingBusy:
+                    db.session.rollback()
+
+            session["user_id"] = user.id
+            # bio is deferred, so only a successful login reads it (dumping
+            # loads it here); failed and sprayed attempts never do.
+            return user_serializer.dump(user), 200
+
+        return {"error": "Invalid credentials"}, 401
+
+
+class Logout(Resource):
+    def delete(self):
+        """Logs the user out."""
+        if "user_id" not in session or session["user_id"] is None:
+            return {"error": "Unauthorized"}, 401  # ✅ Fixed error response
+
+        session.pop("user_id")
+        return {}, 204
+
+
+class RecipeIndex(Resource):
+    @read_only
+    def get(self):
+        """Fetches recipes for logged-in users, optionally one keyset page at a time."""
+        if "user_id" not in session or session["user_id"] is None:
+            return {"error": "Unauthorized"}, 401
+
+        paginated = "limit" in request.args or "after" in request.args
+        if paginated:
+            limit, after, error = keyset_args(request.args)
+            if error:
+                return {"error": error}, 422
+
+        serializer, error = requested_fields(recipe_serializer, request.args)
+        if error:
+            return {"error": error}, 422
+
+        etag = make_etag(TableVersion.current("recipes", "users"), request.query_string)
+        if request.if_none_match.contains_weak(etag):
+            return not_modified(etag)
+
+        # Authors are joined into the same SELECT and rows are serialized
+        # straight from the cursor, without hydrating ORM objects. The id is
+        # appended so the cursor works whatever fields were asked for.
+        stmt = serializer.select(Recipe.id).order_by(Recipe.id)
+
+        if not paginated:
+            rows = db.session.execute(stmt)
+            return serializer.dump_rows(rows), 200, etag_headers(etag)
+
+        # Fetch one extra row to learn whether another page exists.
+        rows = db.session.execute(stmt.where(Recipe.id > after).limit(limit + 1)).all()
+        has_more = len(rows) > limit
+
+        return {
+            "recipes": serializer.dump_rows(rows[:limit]),
+            "next_cursor": rows[limit - 1][-1] if has_more else None,
+        }, 200, etag_headers(etag)
+
+    def post(self):
+        """Allows a logged-in user to create a recipe."""
+        if "user_id" not in session:
+            return {"error": "Unauthorized"}, 401
+
+        fields, error = validate_recipe(request.get_json())
+        if error:
+            return {"error": error}, 422
+
+        recipe = Recipe(user_id=session["user_id"], **fields)
+
+        db.session.add(recipe)
+        db.session.flush()
+        # Dumped before the commit expires the recipe; the author is loaded
+        # without its deferred bio.
+        created = recipe_serializer.dump(recipe)
+        db.session.commit()
+
+        return created, 201  # ✅ Fix: Ensure correct response
+
+
+class RecipeBatch(Resource):
+    def post(self):
+        """Creates many recipes in one transaction, reporting a result per item."""
+        if "user_id" not in session:
+            return {"error": "Unauthorized"}, 401
+
+        items = request.get_json()
+        if not isinstance(items, list) or not items:
+            return {"error": "Expected a non-empty JSON array of recipes."}, 422
+        if len(items) > MAX_BATCH_SIZE:
+            return {"error": f"At most {MAX_BATCH_SIZE} recipes per batch."}, 413
+
+        results = [None] * len(items)
+        rows, positions = [], []
+        for index, item in enumerate(items):
+            fields, error = validate_recipe(item)
+            if error:
+                results[index] = {"index": index, "status": 422, "error": error}
+            else:
+                rows.append({"user_id": session["user_id"], **fields})
+                positions.append(index)
+
+        if rows:
+            # One executemany INSERT ... RETURNING for every valid row.
+            ids = db.session.scalars(
+                insert(Recipe).returning(Recipe.id, sort_by_parameter_order=True),
+                rows,
+            ).all()
+            db.session.commit()
+
+            created = db.session.execute(recipe_serializer.select().where(Recipe.id.in_(ids)))
+            by_id = {row[0]: recipe_serializer.dump_row(row) for row in created}
+            for index, recipe_id in zip(positions, ids):
+                results[index] = {"index": index, "status": 201, "recipe": by_id[recipe_id]}
+
+        return {"created": len(rows), "results": results}, 201 if rows else 422
+
+
+class RecipeExport(Resource):
+    @read_only
+    def get(self):
+        """Streams every recipe as NDJSON (default) or a JSON array."""
+        if "user_id" not in session or session["user_id"] is None:
+            return {"error": "Unauthorized"}, 401
+
+        fmt = request.args.get("format", "ndjson")
+        if fmt not in ("ndjson", "json"):
+            return {"error": "format must be 'ndjson' or 'json'."}, 422
+
+        # Plain column rows keep the identity map empty, and yield_per streams
+        # them off the cursor in batches, so memory stays flat as the table grows.
+        stmt = (
+            recipe_serializer.select()
+            .order_by(Recipe.id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+
+        def generate():
+            result = db.session.execute(stmt)
+            first = True
+            if fmt == "json":
+                yield b"["
+            for rows in result.partitions():
+                lines = [dumps(recipe_serializer.dump_row(row)) for row in rows]
+                if fmt == "json":
+                    yield (b"" if first else b",") + b",".join(lines)
+                else:
+                    yield b"\n".join(lines) + b"\n"
+                first = False
+            if fmt == "json":
+                yield b"]"
+
+        mimetype = "application/json" if fmt == "json" else "application/x-ndjson"
+        return Response(stream_with_context(generate()), mimetype=mimetype)
+
+
+class RecipeSearch(Resource):
+    @read_only
+    def get(self):
+        """Full-text searches recipe titles and instructions, best matches first."""
+        if "user_id" not in session or session["user_id"] is None:
+            return {"error": "Unauthorized"}, 401
+
+        # Quote every word so user input can never be parsed as FTS5 syntax.
+        terms = re.findall(r"\w+", request.args.get("q", ""))
+        if not terms:
+            return {"error": "q must contain at least one word."}, 422
+
+        try:
+            limit = int(request.args.get("limit", DEFAULT_PAGE_SIZE))
+            offset = int(request.args.get("offset", 0))
+        except ValueError:
+            return {"error": "limit and offset must be integers."}, 422
+        if limit <= 0 or offset < 0:
+            return {"error": "limit must be positive and offset non-negative."}, 422
+        limit = min(limit, MAX_PAGE_SIZE)
+
+        # Title matches weigh ten times as much as instruction matches.
+        stmt = (
+            recipe_serializer.select()
+            .join(recipes_fts, recipes_fts.c.rowid == Recipe.id)
+            .where(text("recipes_fts MATCH :query"))
+            .order_by(text("bm25(recipes_fts, 10.0, 1.0)"), Recipe.id)
+            .limit(limit + 1)
+            .offset(offset)
+        )
+        rows = db.session.execute(stmt, {
+            "query": " ".join(f'"{term}"' for term in terms),
+        }).all()
+        has_more = len(rows) > limit
+
+        return {
+            "recipes": recipe_serializer.dump_rows(rows[:limit]),
+            "next_offset": offset + limit if has_more else None,
+        }, 200
+
+
+class UserRecipes(Resource):
+    @read_only
+    def get(self, user_id):
+        """Fetches one user's profile and a keyset page of their recipes."""
+        if "user_id" not in session or session["user_id"] is None:
+            return {"error": "Unauthorized"}, 401
+
+        limit, after, error = keyset_args(request.args)
+        if error:
+            return {"error": error}, 422
+
+        serializer, error = requested_fields(recipe_serializer, request.args)
+        if error:
+            return {"error": error}, 422
+
+        etag = make_etag(TableVersion.current("recipes", "users"), user_id, request.query_string)
+        if request.if_none_match.contains_weak(etag):
+            return not_modified(etag)
+
+        profile = db.session.execute(
+            user_profile_serializer.select().where(User.id == user_id)
+        ).first()
+        if profile is None:
+            return {"error": "User not found."}, 404
+
+        # A range scan on ix_recipes_user_id_id, whatever the user's total.
+        rows = db.session.execute(
+            serializer.select(Recipe.id)
+            .where(Recipe.user_id == user_id, Recipe.id > after)
+            .order_by(Recipe.id)
+            .limit(limit + 1)
+        ).all()
+        has_more = len(rows) > limit
+
+        return {
+            "user": user_profile_serializer.dump_row(profile),
+            "recipes": serializer.dump_rows(rows[:limit]),
+            "next_cursor": rows[limit - 1][-1] if has_more else None,
+        }, 200, etag_headers(etag)
+
+
+class RecipeStats(Resource):
+    @read_only
+    def get(self):
+        """Summarizes recipe cooking times and the most prolific authors."""
+        if "user_id" not in session or session["user_id"] is None:
+            return {"error": "Unauthorized"}, 401
+
+        try:
+            top = int(request.args.get("top", DEFAULT_TOP_AUTHORS))
+        except ValueError:
+            return {"error": "top must be an integer."}, 422
+        if top <= 0:
+            return {"error": "top must be a positive integer."}, 422
+        top = min(top, MAX_PAGE_SIZE)
+
+        etag = make_etag(TableVersion.current("recipes", "users"), request.query_string)
+        if request.if_none_match.contains_weak(etag):
+            return not_modified(etag)
+
+        # Everything below reads the trigger-maintained rollups, never recipes.
+        buckets = select(RecipeMinutes).where(RecipeMinutes.recipe_count > 0).subquery()
+        count, total, fastest, slowest = db.session.execute(select(
+            func.coalesce(func.sum(buckets.c.recipe_count), 0),
+            func.sum(buckets.c.minutes * buckets.c.recipe_count),
+            func.min(buckets.c.minutes),
+            func.max(buckets.c.minutes),
+        )).one()
+
+        minutes = {"average": None, "min": fastest, "max": slowest}
+        minutes.update({f"p{p}": None for p in PERCENTILES})
+        if count:
+            minutes["average"] = round(total / count, 2)
+            # Nearest-rank percentiles: the smallest value whose running count
+            # reaches ceil(p% of all recipes).
+            running = select(
+                buckets.c.minutes,
+                func.sum(buckets.c.recipe_count).over(order_by=buckets.c.minutes).label("running"),
+            ).subquery()
+            values = db.session.execute(select(*(
+                func.min(case((running.c.running >= math.ceil(p * count / 100), running.c.minutes)))
+                for p in PERCENTILES
+            ))).one()
+            minutes.update({f"p{p}": value for p, value in zip(PERCENTILES, values)})
+
+        authors = db.session.execute(
+            user_profile_serializer.select()
+            .where(User.recipe_count > 0)
+            .order_by(User.recipe_count.desc(), User.id)
+            .limit(top)
+        )
+
+        return {
+            "recipe_count": count,
+            "minutes_to_complete": minutes,
+            "top_authors": user_profile_serializer.dump_rows(authors),
+        }, 200, etag_headers(etag)
+
+
+def register_resources(api):
+    api.add_resource(Signup, "/signup")
+    api.add_resource(CheckSession, "/check_session")
+    api.add_resource(Login, "/login")
+    api.add_resource(Logout, "/logout")
+    api.add_resource(RecipeIndex, "/recipes")
+    api.add_resource(RecipeBatch, "/recipes/batch")
+    api.add_resource(RecipeExport, "/recipes/export")
+    api.add_resource(RecipeSearch, "/recipes/search")
+    api.add_resource(RecipeStats, "/recipes/stats")
+    api.add_resource(UserRecipes, "/users/<int:user_id>/recipes")
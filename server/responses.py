@@ -0,0 +1,97 @@
+import gzip
+import json
+
+from flask import current_app, make_response, request
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = frozenset({"application/json", "application/x-ndjson", "text/plain"})
+
+
+def dumps(data):
+    """Encodes JSON to bytes, compactly and with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def output_json(data, code, headers=None):
+    """Flask-RESTful representation honouring JSON_COMPACT."""
+    if current_app.config["JSON_COMPACT"]:
+        body = dumps(data)
+    else:
+        body = json.dumps(data, indent=4).encode("utf-8") + b"\n"
+    response = make_response(body, code)
+    response.mimetype = "application/json"
+    response.headers.extend(headers or {})
+    return response
+
+
+def _encodings():
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def compress_response(response):
+    """Compresses large enough bodies with the best encoding the client accepts.
+
+    Streamed responses are left alone. A strong ETag is weakened, since the
+    compressed bytes differ from the identity representation.
+    """
+    config = current_app.config
+    if (
+        not config["COMPRESS_ENABLED"]
+        or response.direct_passthrough
+        or response.is_streamed
+        or response.status_code < 200
+        or response.status_code in (204, 304)
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    data = response.get_data()
+    if len(data) < config["COMPRESS_MIN_SIZE"]:
+        return response
+
+    response.vary.add("Accept-Encoding")
+    encoding = request.accept_encodings.best_match(_encodings())
+    if encoding == "br":
+        data = brotli.compress(data, quality=config["COMPRESS_BROTLI_QUALITY"])
+    elif encoding == "gzip":
+        data = gzip.compress(data, compresslevel=config["COMPRESS_LEVEL"], mtime=0)
+    else:
+        return response
+
+    response.set_data(data)
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_responses(app, api):
+    """Installs the JSON representation and response compression.
+
+    JSON_COMPACT (default on) drops indentation and uses orjson if present.
+    Bodies of at least COMPRESS_MIN_SIZE bytes are compressed with brotli
+    (if installed, at COMPRESS_BROTLI_QUALITY) or gzip (at COMPRESS_LEVEL).
+    Settings are read per request.
+    """
+    app.config.setdefault("JSON_COMPACT", True)
+    app.config.setdefault("COMPRESS_ENABLED", True)
+    app.config.setdefault("COMPRESS_MIN_SIZE", 500)
+    app.config.setdefault("COMPRESS_LEVEL", 1)
+    app.config.setdefault("COMPRESS_BROTLI_QUALITY", 4)
+    app.json.compact = app.config["JSON_COMPACT"]
+
+    api.representations["application/json"] = output_json
+    app.after_request(compress_response)
@@ -0,0 +1,122 @@
+from sqlalchemy import select
+
+
+class Serializer:
+    """Turns model instances or result rows into JSON-ready dicts.
+
+    The field list is resolved against the mapper once, when the serializer is
+    built, and compiled into two plain functions: one reading attributes off
+    ORM objects and one reading a ``Row`` by position. Nested relationships
+    are written as ``{"user": ("id", "username")}``::
+
+        recipe_serializer = Serializer(
+            Recipe, ("id", "title", {"user": ("id", "username")})
+        )
+        recipe_serializer.dump(recipe)
+        rows = db.session.execute(recipe_serializer.select())
+        recipe_serializer.dump_rows(rows)
+    """
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = fields
+        self.columns = []
+        self.joins = []
+        self._projections = {}
+
+        tree = self._resolve(model, fields, ())
+        self.dump = self._compile(tree, "obj", lambda path, index: "obj." + ".".join(path))
+        self.dump_row = self._compile(tree, "row", lambda path, index: f"row[{index}]")
+
+    def _resolve(self, model, fields, prefix):
+        tree = []
+        for field in fields:
+            if isinstance(field, dict):
+                for name, nested in field.items():
+                    relationship = getattr(model, name)
+                    self.joins.append(relationship)
+                    target = relationship.property.mapper.class_
+                    tree.append((name, self._resolve(target, nested, prefix + (name,))))
+            else:
+                self.columns.append(getattr(model, field))
+                tree.append((field, (prefix + (field,), len(self.columns) - 1)))
+        return tree
+
+    @staticmethod
+    def _compile(tree, arg, accessor):
+        def source(nodes):
+            items = []
+            for key, node in nodes:
+                if isinstance(node, list):
+                    items.append(f"{key!r}: {source(node)}")
+                else:
+                    items.append(f"{key!r}: {accessor(*node)}")
+            return "{" + ", ".join(items) + "}"
+
+        namespace = {}
+        exec(f"def dump({arg}):\n    return {source(tree)}\n", namespace)
+        return namespace["dump"]
+
+    def project(self, paths):
+        """Serializer for just the dotted ``paths``, e.g. ``("title", "user.username")``.
+
+        Naming a relationship keeps all of its fields. Unknown paths raise
+        ValueError. Projections are compiled once and cached.
+        """
+        key = frozenset(paths)
+        projected = self._projections.get(key)
+        if projected is None:
+            valid = set(self._paths(self.fields, ""))
+            unknown = sorted(key - valid)
+            if unknown or not key:
+                raise ValueError(
+                    f"Unknown fields: {', '.join(unknown) or '(none given)'}. "
+                    f"Choose from: {', '.join(sorted(valid))}."
+                )
+            projected = Serializer(self.model, self._filter(self.fields, key, ""))
+            self._projections[key] = projected
+        return projected
+
+    @classmethod
+    def _paths(cls, fields, prefix):
+        for field in fields:
+            if isinstance(field, dict):
+                for name, nested in field.items():
+                    yield prefix + name
+                    yield from cls._paths(nested, f"{prefix}{name}.")
+            else:
+                yield prefix + field
+
+    @classmethod
+    def _filter(cls, fields, wanted, prefix):
+        kept = []
+        for field in fields:
+            if isinstance(field, dict):
+                for name, nested in field.items():
+                    if prefix + name in wanted:
+                        kept.append({name: nested})
+                    else:
+                        sub = cls._filter(nested, wanted, f"{prefix}{name}.")
+                        if sub:
+                            kept.append({name: tuple(sub)})
+            elif prefix + field in wanted:
+                kept.append(field)
+        return tuple(kept)
+
+    def select(self, *extra_columns):
+        """SELECT of exactly the serialized columns, joined through each nested relationship.
+
+        Relationships are inner-joined, so they must be non-nullable.
+        """
+        stmt = select(*self.columns, *extra_columns).select_from(self.model)
+        for relationship in self.joins:
+            stmt = stmt.join(relationship)
+        return stmt
+
+    def dump_many(self, objs):
+        dump = self.dump
+        return [dump(obj) for obj in objs]
+
+    def dump_rows(self, rows):
+        dump_row = self.dump_row
+        return [dump_row(row) for row in rows]
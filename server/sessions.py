@@ -0,0 +1,207 @@
+import os
+import secrets
+import threading
+import time
+
+from flask.sessions import SecureCookieSession, SessionInterface, session_json_serializer
+from itsdangerous import BadSignature, Signer
+
+from database import SQLiteFileStore
+
+
+class ServerSession(SecureCookieSession):
+    """Session data kept server-side; the cookie only carries a signed id."""
+
+    def __init__(self, initial=None, sid=None, new=False):
+        super().__init__(initial)
+        self.sid = sid
+        self.new = new
+        # The user the stored record belongs to; a change means a login.
+        self.loaded_user_id = self.get("user_id")
+
+
+class MemorySessionStore:
+    """Process-local store, for tests and single-process development."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def load(self, sid):
+        entry = self._data.get(sid)
+        if entry is None or entry[2] <= time.time():
+            return None
+        return entry[1]
+
+    def save(self, sid, user_id, data, expires_at):
+        with self._lock:
+            self._data[sid] = (user_id, data, expires_at)
+
+    def delete(self, sid):
+        with self._lock:
+            self._data.pop(sid, None)
+
+    def revoke_user(self, user_id):
+        with self._lock:
+            stale = [sid for sid, entry in self._data.items() if entry[0] == user_id]
+            for sid in stale:
+                del self._data[sid]
+        return len(stale)
+
+    def reset_after_fork(self):
+        self._lock = threading.Lock()
+
+    def sweep(self):
+        now = time.time()
+        with self._lock:
+            stale = [sid for sid, entry in self._data.items() if entry[2] <= now]
+            for sid in stale:
+                del self._data[sid]
+        return len(stale)
+
+
+class SQLiteSessionStore(SQLiteFileStore):
+    """Sessions every worker can read, so a login holds whichever worker serves it."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        conn = self._conn()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "sid TEXT PRIMARY KEY, user_id INTEGER, data TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_sessions_user_id ON sessions (user_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS ix_sessions_expires_at ON sessions (expires_at)")
+
+    def load(self, sid):
+        row = self._conn().execute(
+            "SELECT data FROM sessions WHERE sid = ? AND expires_at > ?", (sid, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def save(self, sid, user_id, data, expires_at):
+        self._conn().execute(
+            "INSERT INTO sessions (sid, user_id, data, expires_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(sid) DO UPDATE SET user_id = excluded.user_id, "
+            "data = excluded.data, expires_at = excluded.expires_at",
+            (sid, user_id, data, expires_at),
+        )
+
+    def delete(self, sid):
+        self._conn().execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+    def revoke_user(self, user_id):
+        return self._conn().execute("DELETE FROM sessions WHERE user_id = ?", (user_id,)).rowcount
+
+    def sweep(self):
+        return self._conn().execute(
+            "DELETE FROM sessions WHERE expires_at <= ?", (time.time(),)
+        ).rowcount
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Flask session interface backed by a MemorySessionStore or SQLiteSessionStore.
+
+    The cookie is only written when a session is created or changed, and
+    Logout deletes the server-side record so the old cookie stops working.
+    When the session's user changes (a login or signup), the old record is
+    deleted and a new id issued, so a planted cookie can't be fixated.
+    Expired records are swept at most every SESSION_SWEEP_INTERVAL seconds.
+    """
+
+    salt = "server-session-id"
+
+    def __init__(self, store, sweep_interval=300):
+        self.store = store
+        self.sweep_interval = sweep_interval
+        self._next_sweep = time.monotonic() + sweep_interval
+
+    def _signer(self, app):
+        return Signer(app.secret_key, salt=self.salt)
+
+    def open_session(self, app, request):
+        if not app.secret_key:
+            return None
+
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if cookie:
+            try:
+                sid = self._signer(app).unsign(cookie).decode("utf-8")
+            except BadSignature:
+                sid = None
+            if sid:
+                data = self.store.load(sid)
+                if data is not None:
+                    return ServerSession(session_json_serializer.loads(data), sid=sid)
+
+        return ServerSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if session.accessed:
+            response.vary.add("Cookie")
+
+        if not session:
+            if session.modified and not session.new:
+                self.store.delete(session.sid)
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        if not session.new and session.get("user_id") != session.loaded_user_id:
+            self.store.delete(session.sid)
+            session.sid = secrets.token_urlsafe(32)
+            session.new = True
+            session.modified = True
+
+        if session.modified:
+            expires_at = time.time() + app.permanent_session_lifetime.total_seconds()
+            self.store.save(
+                session.sid,
+                session.get("user_id"),
+                session_json_serializer.dumps(dict(session)),
+                expires_at,
+            )
+            self._maybe_sweep()
+
+        if session.new or session.modified:
+            response.set_cookie(
+                name,
+                self._signer(app).sign(session.sid.encode("utf-8")).decode("utf-8"),
+                expires=self.get_expiration_time(app, session),
+                httponly=self.get_cookie_httponly(app),
+                domain=domain,
+                path=path,
+                secure=self.get_cookie_secure(app),
+                samesite=self.get_cookie_samesite(app),
+            )
+
+    def _maybe_sweep(self):
+        if time.monotonic() >= self._next_sweep:
+            self._next_sweep = time.monotonic() + self.sweep_interval
+            self.store.sweep()
+
+
+def init_sessions(app):
+    """Installs the server-side session interface chosen by SESSION_BACKEND."""
+    backend = app.config.setdefault("SESSION_BACKEND", "sqlite")
+    if backend == "cookie":
+        return None
+
+    if backend == "memory":
+        store = MemorySessionStore()
+    elif backend == "sqlite":
+        os.makedirs(app.instance_path, exist_ok=True)
+        path = app.config.setdefault(
+            "SESSION_SQLITE_PATH", os.path.join(app.instance_path, "sessions.db")
+        )
+        store = SQLiteSessionStore(path)
+    else:
+        raise ValueError(f"Unknown SESSION_BACKEND {backend!r}")
+
+    app.session_interface = ServerSideSessionInterface(
+        store, sweep_interval=app.config.setdefault("SESSION_SWEEP_INTERVAL", 300)
+    )
+    return store
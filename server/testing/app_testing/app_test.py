@@ -1,15 +1,21 @@
+import json
 from faker import Faker
 import flask
 import pytest
 from random import randint, choice as rc
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 
 from app import app
+from cache import user_cache
+from config import bcrypt, hasher
+from hashing import hash_rounds
 from models import db, User, Recipe
 
 app.secret_key = b'a\xdb\xd2\x13\x93\xc1\xe9\x97\xef2\xe3\x004U\xd1Z'
 
 class TestSignup:
-    '''Signup resource in app.py'''
+    '''Signup resource in resources.py'''
 
     def test_creates_users_at_signup(self):
         '''creates user records with usernames and passwords at /signup.'''
@@ -35,8 +41,241 @@ class TestSignup:
             assert(new_user.image_url == 'https://pokemon.com/ash.jpg')
             assert(new_user.bio == 'Trainer of the best Pokémon.')
 
+    def test_returns_422_for_invalid_signups(self):
+        '''rejects missing, empty or non-string credentials and profile fields.'''
+
+        with app.test_client() as client:
+            for payload in (
+                {},
+                {'username': 'ashketchum'},
+                {'username': '', 'password': 'pikachu'},
+                {'username': 'ashketchum', 'password': 25},
+                {'username': 'ashketchum', 'password': 'pikachu', 'bio': ['Trainer']},
+            ):
+                response = client.post('/signup', json=payload)
+                assert response.status_code == 422
+                assert 'error' in response.json
+
+class TestCheckSession:
+    '''CheckSession resource in resources.py'''
+
+    def test_serves_cached_profile_until_user_changes(self):
+        '''caches the session profile and drops it when the User row is updated.'''
+
+        with app.app_context():
+            User.query.delete()
+            db.session.commit()
+
+            user = User(username="Slagathor", bio="Before")
+            user.set_password('secret')
+            db.session.add(user)
+            db.session.commit()
+            user_id = user.id
+
+        with app.test_client() as client:
+            with client.session_transaction() as session:
+                session['user_id'] = user_id
+
+            assert client.get('/check_session').get_json()['bio'] == "Before"
+            hits = user_cache.stats()['hits']
+            assert client.get('/check_session').get_json()['bio'] == "Before"
+            assert user_cache.stats()['hits'] == hits + 1
+
+            with app.app_context():
+                db.session.get(User, user_id).bio = "After"
+                db.session.commit()
+
+            assert client.get('/check_session').get_json()['bio'] == "After"
+
+    def test_answers_conditional_get_with_304(self):
+        '''returns 304 for a matching If-None-Match and a new ETag after the user changes.'''
+
+        with app.app_context():
+            User.query.delete()
+            db.session.commit()
+
+            user = User(username="Slagathor", bio="Before")
+            user.set_password('secret')
+            db.session.add(user)
+            db.session.commit()
+            user_id = user.id
+
+        with app.test_client() as client:
+            with client.session_transaction() as session:
+                session['user_id'] = user_id
+
+            etag = client.get('/check_session').headers['ETag']
+            response = client.get('/check_session', headers={'If-None-Match': etag})
+            assert response.status_code == 304
+
+            with app.app_context():
+                db.session.get(User, user_id).bio = "After"
+                db.session.commit()
+
+            response = client.get('/check_session', headers={'If-None-Match': etag})
+            assert response.status_code == 200
+            assert response.headers['ETag'] != etag
+
+class TestLogin:
+    '''Login resource in resources.py'''
+
+    def test_rehashes_password_with_stale_cost(self):
+        '''rehashes a stored password made with a different bcrypt cost on login.'''
+
+        with app.app_context():
+            User.query.delete()
+            db.session.commit()
+
+            user = User(username="Slagathor")
+            user._password_hash = bcrypt.generate_password_hash('secret', 4).decode('utf-8')
+            db.session.add(user)
+            db.session.commit()
+
+        with app.test_client() as client:
+            response = client.post('/login', json={
+                'username': 'Slagathor',
+                'password': 'secret',
+            })
+            assert response.status_code == 200
+
+        with app.app_context():
+            user = User.query.filter_by(username="Slagathor").first()
+            assert hash_rounds(user._password_hash) == app.config['BCRYPT_LOG_ROUNDS']
+            assert user.check_password('secret')
+
+    def test_reads_bio_only_after_successful_login(self):
+        '''leaves the deferred bio unread until the password checks out.'''
+
+        with app.app_context():
+            User.query.delete()
+            db.session.commit()
+
+            user = User(username="Slagathor", bio="Lives in the walls.")
+            user.set_password('secret')
+            db.session.add(user)
+            db.session.commit()
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(Engine, 'before_cursor_execute', record)
+        try:
+            with app.test_client() as client:
+                response = client.post('/login', json={
+                    'username': 'Slagathor',
+                    'password': 'wrong',
+                })
+                assert response.status_code == 401
+                assert statements and not any('users.bio' in s for s in statements)
+
+                response = client.post('/login', json={
+                    'username': 'Slagathor',
+                    'password': 'secret',
+                })
+                assert response.status_code == 200
+                assert response.json['bio'] == "Lives in the walls."
+        finally:
+            event.remove(Engine, 'before_cursor_execute', record)
+
+    def test_returns_401_for_missing_credentials(self):
+        '''rejects missing, empty or non-string credentials without hashing.'''
+
+        with app.test_client() as client:
+            for payload in (
+                {},
+                {'username': 'nobody'},
+                {'username': 'u'},
+                {'username': '', 'password': 'secret'},
+                {'username': 'u', 'password': ['secret']},
+            ):
+                response = client.post('/login', json=payload)
+                assert response.status_code == 401
+                assert response.json == {'error': 'Invalid credentials'}
+
+    def test_issues_new_session_id_on_login(self):
+        '''rotates the session cookie on login, so a planted cookie stops working.'''
+
+        with app.app_context():
+            User.query.delete()
+            db.session.commit()
+
+        def session_cookie(response):
+            cookies = response.headers.getlist('Set-Cookie')
+            return next(c.split(';', 1)[0] for c in cookies if c.startswith('session='))
+
+        with app.test_client(use_cookies=False) as client:
+            client.post('/signup', json={'username': 'Slagathor', 'password': 'secret'})
+            response = client.post('/signup', json={'username': 'mallory', 'password': 'secret'})
+            planted = session_cookie(response)
+
+            response = client.post('/login', headers={'Cookie': planted}, json={
+                'username': 'Slagathor',
+                'password': 'secret',
+            })
+            assert response.status_code == 200
+            issued = session_cookie(response)
+            assert issued != planted
+
+            assert client.get('/check_session', headers={'Cookie': planted}).status_code == 401
+            response = client.get('/check_session', headers={'Cookie': issued})
+            assert response.json['username'] == 'Slagathor'
+
+    def test_rate_limits_attempts_before_hashing(self, monkeypatch):
+        '''answers 429 without a hash check once the bucket is empty, and hashes unknown usernames.'''
+
+        checks = []
+        check_password_hash = hasher.check_password_hash
+
+        def counting_check(*args):
+            checks.append(args)
+            return check_password_hash(*args)
+
+        monkeypatch.setattr(hasher, "check_password_hash", counting_check)
+        monkeypatch.setattr(app.extensions["login_limiter"], "username_bucket", (2, 0.001))
+
+        with app.test_client() as client:
+            for _ in range(2):
+                response = client.post('/login', json={'username': 'nobody', 'password': 'guess'})
+                assert response.status_code == 401
+            assert len(checks) == 2
+
+            response = client.post('/login', json={'username': 'nobody', 'password': 'guess'})
+            assert response.status_code == 429
+            assert int(response.headers['Retry-After']) > 0
+            assert len(checks) == 2
+
+class TestLogout:
+    '''Logout resource in resources.py'''
+
+    def test_revokes_session_server_side(self):
+        '''deletes the server-side session so the old cookie no longer works.'''
+
+        with app.app_context():
+            User.query.delete()
+            db.session.commit()
+
+            user = User(username="Slagathor")
+            user.set_password('secret')
+            db.session.add(user)
+            db.session.commit()
+
+        with app.test_client() as client:
+            client.post('/login', json={
+                'username': 'Slagathor',
+                'password': 'secret',
+            })
+            stolen = next(c.value for c in client.cookie_jar if c.name == 'session')
+
+            assert client.delete('/logout').status_code == 204
+
+        with app.test_client() as client:
+            client.set_cookie('localhost', 'session', stolen)
+            assert client.get('/check_session').status_code == 401
+
 class TestRecipeIndex:
-    '''RecipeIndex resource in app.py'''
+    '''RecipeIndex resource in resources.py'''
 
     def test_lists_recipes_with_200(self):
         '''returns a list of recipes associated with the logged in user and a 200 status code.'''
@@ -89,6 +328,213 @@ class TestRecipeIndex:
                 assert response_json[i]['instructions']
                 assert response_json[i]['minutes_to_complete']
 
+    def test_paginates_recipes_by_cursor(self):
+        '''returns keyset pages of recipes with a next_cursor when limit is given.'''
+
+        with app.app_context():
+            Recipe.query.delete()
+            User.query.delete()
+            db.session.commit()
+
+            fake = Faker()
+
+            user = User(username="Slagathor")
+            user.set_password('secret')
+            db.session.add(user)
+            db.session.commit()
+
+            db.session.add_all([
+                Recipe(
+                    title=fake.sentence(),
+                    instructions=fake.paragraph(nb_sentences=8),
+                    minutes_to_complete=randint(15, 90),
+                    user_id=user.id,
+                )
+                for i in range(5)
+            ])
+            db.session.commit()
+
+        with app.test_client() as client:
+            client.post('/login', json={
+                'username': 'Slagathor',
+                'password': 'secret',
+            })
+
+            first = client.get('/recipes?limit=3').get_json()
+            assert len(first['recipes']) == 3
+            assert first['recipes'][0]['user']['username'] == 'Slagathor'
+            assert first['next_cursor'] == first['recipes'][-1]['id']
+
+            second = client.get(f"/recipes?limit=3&after={first['next_cursor']}").get_json()
+            assert len(second['recipes']) == 2
+            assert second['next_cursor'] is None
+
+            ids = [r['id'] for r in first['recipes'] + second['recipes']]
+            assert ids == sorted(set(ids))
+
+            assert client.get('/recipes?limit=abc').status_code == 422
+
+            sparse = client.get('/recipes?limit=3&fields=title,user.username').get_json()
+            assert sparse['recipes'][0] == {
+                'title': first['recipes'][0]['title'], 'user': {'username': 'Slagathor'},
+            }
+            assert sparse['next_cursor'] == first['next_cursor']
+            assert client.get('/recipes?fields=title,secret').status_code == 422
+
+    def test_answers_conditional_get_with_304(self):
+        '''returns 304 while recipes are unchanged and 200 once a recipe is added.'''
+
+        with app.app_context():
+            Recipe.query.delete()
+            User.query.delete()
+            db.session.commit()
+
+            user = User(username="Slagathor")
+            user.set_password('secret')
+            db.session.add(user)
+            db.session.commit()
+
+        with app.test_client() as client:
+            client.post('/login', json={
+                'username': 'Slagathor',
+                'password': 'secret',
+            })
+
+            etag = client.get('/recipes').headers['ETag']
+            response = client.get('/recipes', headers={'If-None-Match': etag})
+            assert response.status_code == 304
+            assert client.get('/recipes?limit=5', headers={'If-None-Match': etag}).status_code == 200
+
+            client.post('/recipes', json={
+                'title': 'Toast',
+                'instructions': 'Put the bread in the toaster and wait until it turns golden brown.',
+                'minutes_to_complete': 5,
+            })
+
+            response = client.get('/recipes', headers={'If-None-Match': etag})
+            assert response.status_code == 200
+            assert len(response.get_json()) == 1
+
+    def test_creates_recipes_in_batch(self):
+        '''inserts the valid recipes from /recipes/batch and reports errors per item.'''
+
+        with app.app_context():
+            Recipe.query.delete()
+            User.query.delete()
+            db.session.commit()
+
+            user = User(username="Slagathor")
+            user.set_password('secret')
+            db.session.add(user)
+            db.session.commit()
+
+        with app.test_client() as client:
+            client.post('/login', json={
+                'username': 'Slagathor',
+                'password': 'secret',
+            })
+
+            instructions = 'Put the bread in the toaster and wait until it turns golden brown.'
+            response = client.post('/recipes/batch', json=[
+                {'title': 'Toast', 'instructions': instructions, 'minutes_to_complete': 5},
+                {'title': 'Short', 'instructions': 'Too short!', 'minutes_to_complete': 5},
+                {'title': 'Bagel', 'instructions': instructions, 'minutes_to_complete': 6},
+            ])
+            body = response.get_json()
+
+            assert response.status_code == 201
+            assert body['created'] == 2
+            assert [r['status'] for r in body['results']] == [201, 422, 201]
+            assert body['results'][2]['recipe']['title'] == 'Bagel'
+            assert body['results'][2]['recipe']['user']['username'] == 'Slagathor'
+
+        with app.app_context():
+            assert Recipe.query.count() == 2
+
+    def test_exports_recipes_as_stream(self):
+        '''streams every recipe from /recipes/export as NDJSON or a JSON array.'''
+
+        with app.app_context():
+            Recipe.query.delete()
+            User.query.delete()
+            db.session.commit()
+
+            fake = Faker()
+
+            user = User(username="Slagathor")
+            user.set_password('secret')
+            db.session.add(user)
+            db.session.commit()
+
+            db.session.add_all([
+                Recipe(
+                    title=fake.sentence(),
+                    instructions=fake.paragraph(nb_sentences=8),
+                    minutes_to_complete=randint(15, 90),
+                    user_id=user.id,
+                )
+                for i in range(4)
+            ])
+            db.session.commit()
+
+        with app.test_client() as client:
+            assert client.get('/recipes/export').status_code == 401
+
+            client.post('/login', json={
+                'username': 'Slagathor',
+                'password': 'secret',
+            })
+
+            response = client.get('/recipes/export')
+            assert response.status_code == 200
+            assert response.mimetype == 'application/x-ndjson'
+            lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+            assert len(lines) == 4
+            assert lines[0]['user']['username'] == 'Slagathor'
+
+            response = client.get('/recipes/export?format=json')
+            assert [r['id'] for r in response.get_json()] == [r['id'] for r in lines]
+
+    def test_searches_recipes_by_relevance(self):
+        '''ranks /recipes/search matches with title hits first and pages by offset.'''
+
+        with app.app_context():
+            Recipe.query.delete()
+            User.query.delete()
+            db.session.commit()
+
+            user = User(username="Slagathor")
+            user.set_password('secret')
+            db.session.add(user)
+            db.session.commit()
+
+            filler = "Stir everything together and let it rest before serving it warm."
+            db.session.add_all([
+                Recipe(title="Garlic Bread", instructions=filler,
+                       minutes_to_complete=20, user_id=user.id),
+                Recipe(title="Tomato Soup", instructions=filler + " Add roasted garlic.",
+                       minutes_to_complete=40, user_id=user.id),
+                Recipe(title="Fruit Salad", instructions=filler,
+                       minutes_to_complete=10, user_id=user.id),
+            ])
+            db.session.commit()
+
+        with app.test_client() as client:
+            client.post('/login', json={
+                'username': 'Slagathor',
+                'password': 'secret',
+            })
+
+            response = client.get('/recipes/search?q=garlic')
+            titles = [r['title'] for r in response.get_json()['recipes']]
+            assert titles == ["Garlic Bread", "Tomato Soup"]
+
+            page = client.get('/recipes/search?q=garlic&limit=1').get_json()
+            assert len(page['recipes']) == 1
+            assert page['next_offset'] == 1
+
+            assert client.get('/recipes/search?q="').status_code == 422
+
     def test_get_route_returns_401_when_not_logged_in(self):
         with app.app_context():
             Recipe.query.delete()
@@ -168,3 +614,103 @@ class TestRecipeIndex:
             })
 
             assert response.status_code == 422  # ✅ FIXED
+
+class TestUserRecipes:
+    '''UserRecipes resource in resources.py'''
+
+    def test_pages_one_users_recipes_with_counters(self):
+        '''returns a user's recipes a page at a time, with trigger-maintained counters.'''
+
+        with app.app_context():
+            Recipe.query.delete()
+            User.query.delete()
+            db.session.commit()
+
+            author = User(username="Slagathor")
+            author.set_password('secret')
+            other = User(username="Mad Max")
+            other.set_password('secret')
+            db.session.add_all([author, other])
+            db.session.commit()
+            author_id, other_id = author.id, other.id
+
+            instructions = "Stir the pot slowly for a while, then leave it to simmer for an hour."
+            db.session.add_all(
+                [Recipe(title=f"Stew {i}", instructions=instructions,
+                        minutes_to_complete=10 * (i + 1), user_id=author_id) for i in range(3)]
+                + [Recipe(title="Other", instructions=instructions,
+                          minutes_to_complete=5, user_id=other_id)]
+            )
+            db.session.commit()
+
+        with app.test_client() as client:
+            client.post('/login', json={'username': 'Slagathor', 'password': 'secret'})
+
+            first = client.get(f'/users/{author_id}/recipes?limit=2').get_json()
+            assert first['user']['recipe_count'] == 3
+            assert first['user']['total_minutes'] == 60
+            assert [r['title'] for r in first['recipes']] == ['Stew 0', 'Stew 1']
+
+            second = client.get(
+                f"/users/{author_id}/recipes?limit=2&after={first['next_cursor']}"
+            ).get_json()
+            assert [r['title'] for r in second['recipes']] == ['Stew 2']
+            assert second['next_cursor'] is None
+
+            with app.app_context():
+                Recipe.query.filter_by(title='Stew 2').delete()
+                db.session.commit()
+
+            profile = client.get(f'/users/{author_id}/recipes').get_json()['user']
+            assert (profile['recipe_count'], profile['total_minutes']) == (2, 30)
+
+            assert client.get('/users/0/recipes').status_code == 404
+
+class TestRecipeStats:
+    '''RecipeStats resource in resources.py'''
+
+    def test_summarizes_recipes_from_rollups(self):
+        '''reports counts, average and percentile minutes and top authors, and rebuilds them.'''
+
+        with app.app_context():
+            Recipe.query.delete()
+            User.query.delete()
+            db.session.commit()
+
+            users = [User(username=name) for name in ("Slagathor", "Mad Max")]
+            for user in users:
+                user.set_password('secret')
+            db.session.add_all(users)
+            db.session.commit()
+
+            instructions = "Stir the pot slowly for a while, then leave it to simmer for an hour."
+            db.session.add_all([
+                Recipe(title=f"Stew {minutes}", instructions=instructions,
+                       minutes_to_complete=minutes, user_id=users[minutes > 30].id)
+                for minutes in (10, 20, 30, 40)
+            ] + [
+                Recipe(title="Roast", instructions=instructions,
+                       minutes_to_complete=100, user_id=users[0].id)
+            ])
+            db.session.commit()
+
+        with app.test_client() as client:
+            client.post('/login', json={'username': 'Slagathor', 'password': 'secret'})
+
+            stats = client.get('/recipes/stats').get_json()
+            assert stats['recipe_count'] == 5
+            assert stats['minutes_to_complete'] == {
+                'average': 40.0, 'min': 10, 'max': 100,
+                'p50': 30, 'p90': 100, 'p95': 100, 'p99': 100,
+            }
+            assert [(a['username'], a['recipe_count']) for a in stats['top_authors']] == [
+                ('Slagathor', 4), ('Mad Max', 1),
+            ]
+            assert client.get('/recipes/stats?top=1').get_json()['top_authors'][0]['total_minutes'] == 160
+
+            with app.app_context():
+                db.session.execute(db.text("DELETE FROM recipe_minutes_histogram"))
+                db.session.commit()
+            assert app.test_cli_runner().invoke(args=['rebuild-stats']).exit_code == 0
+
+            assert client.get('/recipes/stats').get_json() == stats
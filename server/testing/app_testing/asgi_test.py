@@ -0,0 +1,164 @@
+import asyncio
+import gzip
+import json
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("asgiref")
+
+from app import app  # noqa: E402
+from asgi import application  # noqa: E402
+from models import db, Recipe, User  # noqa: E402
+
+INSTRUCTIONS = "Mix the flour and water, knead for ten minutes, then bake for forty."
+
+
+def call(method, path, body=None, cookie=None, query="", etag=None, encoding=None):
+    """Runs one request through the ASGI app, returning (status, headers, body)."""
+    headers = [(b"content-type", b"application/json")]
+    if cookie:
+        headers.append((b"cookie", cookie.encode("latin-1")))
+    if etag:
+        headers.append((b"if-none-match", etag.encode("latin-1")))
+    if encoding:
+        headers.append((b"accept-encoding", encoding.encode("latin-1")))
+    scope = {
+        "type": "http", "http_version": "1.1", "method": method, "path": path,
+        "root_path": "", "scheme": "http", "query_string": query.encode("latin-1"),
+        "headers": headers, "server": ("testserver", 80), "client": ("127.0.0.1", 1234),
+    }
+    payload = json.dumps(body).encode("utf-8") if body is not None else b""
+    messages = [{"type": "http.request", "body": payload, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(application(scope, receive, send))
+    start = sent[0]
+    response_headers = {"set-cookie": []}
+    for name, value in start["headers"]:
+        if name == b"set-cookie":
+            response_headers["set-cookie"].append(value.decode())
+        else:
+            response_headers[name.decode()] = value.decode()
+    content = b"".join(m.get("body", b"") for m in sent[1:])
+    return start["status"], response_headers, content
+
+
+def session_cookie(headers, name="session"):
+    return next(
+        c.split(";", 1)[0] for c in headers["set-cookie"] if c.startswith(f"{name}=")
+    )
+
+
+class TestAsyncAPI:
+    '''AsyncAPI in asgi.py'''
+
+    def test_serves_auth_and_recipes_like_the_flask_resources(self):
+        '''signs up, checks the session, creates and lists recipes and logs out.'''
+
+        with app.app_context():
+            Recipe.query.delete()
+            User.query.delete()
+            db.session.commit()
+
+        status, headers, body = call("POST", "/signup", {"username": "async", "password": "pw"})
+        assert status == 201
+        assert json.loads(body)["username"] == "async"
+        cookie = session_cookie(headers)
+
+        status, _, _ = call("POST", "/signup", {"username": "async", "password": "pw"})
+        assert status == 422
+        status, _, _ = call("POST", "/signup", {"username": "other", "password": 1})
+        assert status == 422
+
+        status, headers, body = call("GET", "/check_session", cookie=cookie)
+        assert status == 200
+        assert json.loads(body)["username"] == "async"
+        status, _, _ = call("GET", "/check_session", cookie=cookie, etag=headers["etag"])
+        assert status == 304
+
+        status, _, body = call("POST", "/recipes", {
+            "title": "Bread", "instructions": INSTRUCTIONS, "minutes_to_complete": 60,
+        }, cookie=cookie)
+        assert status == 201
+        assert json.loads(body)["user"]["username"] == "async"
+
+        status, _, body = call("GET", "/recipes", cookie=cookie, query="limit=1")
+        assert status == 200
+        assert [r["title"] for r in json.loads(body)["recipes"]] == ["Bread"]
+
+        status, _, _ = call("DELETE", "/logout", cookie=cookie)
+        assert status == 204
+        status, _, _ = call("GET", "/check_session", cookie=cookie)
+        assert status == 401
+
+        status, headers, _ = call("POST", "/login", {"username": "async", "password": "pw"})
+        assert status == 200
+        status, _, _ = call("POST", "/login", {"username": "async", "password": "nope"})
+        assert status == 401
+        for payload in ({}, {"username": "nobody"}, {"username": "async", "password": 1}):
+            status, _, _ = call("POST", "/login", payload)
+            assert status == 401
+
+    def test_hands_other_routes_to_flask(self):
+        '''passes routes without an async handler through to the WSGI app.'''
+
+        status, _, body = call("GET", "/recipes/search", query="q=bread")
+        assert status == 401
+        assert json.loads(body) == {"error": "Unauthorized"}
+
+    def test_runs_the_apps_request_hooks(self):
+        '''sets the read-your-writes cookie and records metrics for async routes.'''
+
+        with app.app_context():
+            Recipe.query.delete()
+            User.query.delete()
+            db.session.commit()
+
+        def recorded():
+            series = 'http_request_duration_seconds_count{endpoint="/recipes",method="POST"} '
+            with app.test_client() as client:
+                metrics = client.get("/metrics").get_data(as_text=True)
+            return sum(
+                int(line[len(series):]) for line in metrics.splitlines() if line.startswith(series)
+            )
+
+        before = recorded()
+        _, headers, _ = call("POST", "/signup", {"username": "hooked", "password": "pw"})
+        cookie = session_cookie(headers)
+        assert session_cookie(headers, app.config["DB_STICKY_COOKIE"])
+
+        status, headers, _ = call("POST", "/recipes", {
+            "title": "Bread", "instructions": INSTRUCTIONS, "minutes_to_complete": 60,
+        }, cookie=cookie)
+        assert status == 201
+        assert session_cookie(headers, app.config["DB_STICKY_COOKIE"])
+        assert recorded() == before + 1
+
+    def test_compresses_recipe_pages(self):
+        '''gzips a large enough GET /recipes page and varies on Accept-Encoding.'''
+
+        with app.app_context():
+            Recipe.query.delete()
+            User.query.delete()
+            db.session.commit()
+
+        _, headers, _ = call("POST", "/signup", {"username": "squeezed", "password": "pw"})
+        cookie = session_cookie(headers)
+        for i in range(10):
+            call("POST", "/recipes", {
+                "title": f"Bread {i}", "instructions": INSTRUCTIONS, "minutes_to_complete": 60,
+            }, cookie=cookie)
+
+        status, headers, body = call("GET", "/recipes", cookie=cookie, query="limit=20", encoding="gzip")
+        assert status == 200
+        assert headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in headers["vary"]
+        assert headers["etag"].startswith('W/')
+        assert len(json.loads(gzip.decompress(body))["recipes"]) == 10
@@ -0,0 +1,32 @@
+import time
+
+from cache import LRUCache
+
+
+class TestLRUCache:
+    '''LRUCache in cache.py'''
+
+    def test_evicts_least_recently_used(self):
+        '''evicts the least recently used entry past maxsize and counts hits and misses.'''
+
+        cache = LRUCache(maxsize=2, ttl=60)
+        cache.set(1, 'a')
+        cache.set(2, 'b')
+        assert cache.get(1) == 'a'
+
+        cache.set(3, 'c')
+
+        assert cache.get(2) is None
+        assert cache.get(1) == 'a'
+        assert cache.get(3) == 'c'
+        assert cache.stats() == {'hits': 3, 'misses': 1, 'size': 2}
+
+    def test_expires_entries_after_ttl(self):
+        '''treats entries older than ttl as misses.'''
+
+        cache = LRUCache(ttl=0.01)
+        cache.set(1, 'a')
+        time.sleep(0.02)
+
+        assert cache.get(1) is None
+        assert cache.stats()['size'] == 0
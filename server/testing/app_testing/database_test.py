@@ -0,0 +1,86 @@
+import sqlite3
+import time
+
+import pytest
+from flask import Flask, g
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.exc import OperationalError
+
+from app import app
+from database import READ_BIND, RoutingSession, configure_binds, init_engines, sync_sqlite_replica
+from models import db
+
+
+class TestRoutingSession:
+    '''RoutingSession and engine pragmas in database.py'''
+
+    def test_routes_read_only_views_to_query_only_pool(self):
+        '''sends @read_only reads to the read-only pool, which refuses writes.'''
+
+        with app.test_request_context('/'):
+            assert db.session.get_bind() is db.engines[None]
+
+        with app.test_request_context('/'):
+            g.db_read_only = True
+            assert db.session.get_bind() is db.engines[READ_BIND]
+
+            with pytest.raises(OperationalError, match="readonly"):
+                db.session.execute(db.text("DELETE FROM table_versions"))
+            db.session.rollback()
+
+    def test_reads_own_writes_from_primary(self):
+        '''keeps reads on the primary after a write and while the sticky cookie is fresh.'''
+
+        with app.test_request_context('/'):
+            g.db_read_only = True
+            g.db_wrote = True
+            assert db.session.get_bind() is db.engines[None]
+
+        cookie = f"{app.config['DB_STICKY_COOKIE']}={time.time() + 5}"
+        with app.test_request_context('/', headers={"Cookie": cookie}):
+            g.db_read_only = True
+            assert db.session.get_bind() is db.engines[None]
+
+        expired = f"{app.config['DB_STICKY_COOKIE']}={time.time() - 5}"
+        with app.test_request_context('/', headers={"Cookie": expired}):
+            g.db_read_only = True
+            assert db.session.get_bind() is db.engines[READ_BIND]
+
+    def test_sync_sqlite_replica(self, tmp_path):
+        '''copies the primary database into a replica file.'''
+
+        primary, replica = str(tmp_path / "primary.db"), str(tmp_path / "replica.db")
+        with sqlite3.connect(primary) as connection:
+            connection.execute("CREATE TABLE t (x)")
+            connection.execute("INSERT INTO t VALUES (42)")
+        sync_sqlite_replica(primary, replica)
+
+        connection = sqlite3.connect(replica)
+        assert connection.execute("SELECT x FROM t").fetchall() == [(42,)]
+        connection.close()
+
+    def test_applies_sqlite_pragmas(self):
+        '''opens SQLite connections in WAL mode with the configured pragmas.'''
+
+        with app.app_context():
+            assert db.session.execute(db.text("PRAGMA journal_mode")).scalar() == "wal"
+            assert db.session.execute(db.text("PRAGMA synchronous")).scalar() == 1
+            assert db.session.execute(db.text("PRAGMA busy_timeout")).scalar() == 5000
+
+    def test_keeps_pragmas_to_their_own_app(self, tmp_path):
+        '''applies each app's pragmas only to that app's engines.'''
+
+        url = f"sqlite:///{tmp_path / 'other.db'}"
+        other = Flask(__name__)
+        other.config.update(SQLALCHEMY_DATABASE_URI=url, SQLITE_PRAGMAS={})
+        configure_binds(other, url, [], pool_size=1)
+        other_db = SQLAlchemy(session_options={"class_": RoutingSession})
+        other_db.init_app(other)
+        init_engines(other, other_db)
+
+        with other.app_context():
+            assert other_db.session.execute(db.text("PRAGMA journal_mode")).scalar() == "delete"
+            other_db.engine.dispose()
+
+        with app.app_context():
+            assert db.session.execute(db.text("PRAGMA journal_mode")).scalar() == "wal"
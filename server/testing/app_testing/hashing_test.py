@@ -0,0 +1,75 @@
+import os
+import signal
+
+import pytest
+from flask import Flask
+
+from config import bcrypt
+from hashing import HashingBusy, PasswordHasher
+
+
+def make_app(**config):
+    app = Flask(__name__)
+    app.config.update({"HASHING_EXECUTOR": "thread", **config})
+    return app
+
+
+class TestPasswordHasher:
+    '''PasswordHasher in hashing.py'''
+
+    def test_hashes_compatible_with_flask_bcrypt(self):
+        '''produces hashes flask_bcrypt can verify, on a thread pool.'''
+
+        hasher = PasswordHasher(bcrypt, make_app(HASHING_WORKERS=2))
+
+        pw_hash = hasher.generate_password_hash("pikachu")
+
+        assert bcrypt.check_password_hash(pw_hash, "pikachu")
+        assert hasher.check_password_hash(pw_hash, "pikachu")
+        assert not hasher.check_password_hash(pw_hash, "raichu")
+        hasher.shutdown()
+
+    def test_raises_when_queue_is_full(self):
+        '''raises HashingBusy instead of queueing past HASHING_MAX_PENDING.'''
+
+        hasher = PasswordHasher(bcrypt, make_app(HASHING_MAX_PENDING=1, HASHING_QUEUE_TIMEOUT=0.01))
+        hasher._slots.acquire()
+
+        with pytest.raises(HashingBusy):
+            hasher.generate_password_hash("pikachu")
+
+    def test_resets_pool_after_fork(self):
+        '''drops the inherited pool and frees every queue slot in a forked worker.'''
+
+        hasher = PasswordHasher(bcrypt, make_app(HASHING_MAX_PENDING=1, HASHING_QUEUE_TIMEOUT=0.01))
+        hasher.generate_password_hash("pikachu")
+        hasher._slots.acquire()
+        parent_executor = hasher._executor
+
+        hasher.reset_after_fork()
+
+        assert hasher._executor is None
+        assert bcrypt.check_password_hash(hasher.generate_password_hash("pikachu"), "pikachu")
+        assert hasher._executor is not parent_executor
+        parent_executor.shutdown()
+        hasher.shutdown()
+
+    def test_replaces_pool_after_a_process_dies(self):
+        '''starts a fresh process pool once a pool process has been killed.'''
+
+        hasher = PasswordHasher(bcrypt, make_app(
+            HASHING_EXECUTOR="process", HASHING_WORKERS=1, BCRYPT_LOG_ROUNDS=4,
+        ))
+        pw_hash = hasher.generate_password_hash("pikachu")
+        broken = hasher._executor
+        for process in list(broken._processes.values()):
+            os.kill(process.pid, signal.SIGKILL)
+            process.join()
+
+        try:
+            assert hasher.check_password_hash(pw_hash, "pikachu")
+        except HashingBusy:
+            # The kill was noticed with this hash in flight; the next one recovers.
+            assert hasher.check_password_hash(pw_hash, "pikachu")
+        assert hasher._executor is not broken
+        hasher.shutdown()
@@ -0,0 +1,67 @@
+import logging
+
+import pytest
+
+import metrics
+from app import app
+from sqlalchemy.exc import IntegrityError
+
+from models import db, User
+
+
+class TestMetrics:
+    '''/metrics endpoint in metrics.py'''
+
+    def test_exposes_per_endpoint_histograms(self):
+        '''reports request time and SQL statement counts per endpoint in Prometheus format.'''
+
+        with app.app_context():
+            User.query.delete()
+            db.session.commit()
+
+        with app.test_client() as client:
+            client.post('/login', json={'username': 'nobody', 'password': 'secret'})
+
+            response = client.get('/metrics')
+            body = response.get_data(as_text=True)
+
+            assert response.status_code == 200
+            assert 'http_request_duration_seconds_count{endpoint="/login",method="POST"}' in body
+            assert 'db_statements_per_request_bucket{endpoint="/login",method="POST",le="1"}' in body
+            assert 'user_cache_hits_total' in body
+
+    def test_logs_slow_queries_without_parameters(self, caplog, monkeypatch):
+        '''logs statements over the threshold with their parameter values redacted.'''
+
+        monkeypatch.setattr(metrics, "_slow_query_threshold", 0)
+
+        with app.app_context():
+            with caplog.at_level(logging.WARNING, logger="app.slow_queries"):
+                db.session.execute(
+                    db.select(User).where(User.username == 'hunter2-secret')
+                ).all()
+
+        assert 'slow query' in caplog.text
+        assert 'FROM users' in caplog.text
+        assert 'hunter2-secret' not in caplog.text
+
+    def test_leaves_no_timing_state_after_failed_statements(self):
+        '''keeps nothing on the connection when a timed statement fails.'''
+
+        with app.app_context():
+            User.query.delete()
+            db.session.commit()
+            user = User(username='Slagathor', _password_hash='x')
+            db.session.add(user)
+            db.session.commit()
+
+            connection = db.session.connection()
+            info = repr(connection.info)
+            for _ in range(3):
+                with pytest.raises(IntegrityError):
+                    with connection.begin_nested():
+                        connection.execute(
+                            db.insert(User).values(username='Slagathor', _password_hash='x')
+                        )
+            assert repr(connection.info) == info
+            db.session.rollback()
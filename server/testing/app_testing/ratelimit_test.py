@@ -0,0 +1,43 @@
+import pytest
+
+from ratelimit import LoginLimiter, MemoryBucketStore, SQLiteBucketStore
+
+
+STORES = (MemoryBucketStore, SQLiteBucketStore)
+
+
+class TestBucketStores:
+    '''Token bucket stores in ratelimit.py'''
+
+    def test_refills_at_the_configured_rate(self, store):
+        '''allows a burst of capacity attempts, then one per refill interval.'''
+
+        assert [store.take("k", 3, 0.5, 100.0) for _ in range(3)] == [0, 0, 0]
+        assert store.take("k", 3, 0.5, 100.0) == pytest.approx(2.0)
+        assert store.take("k", 3, 0.5, 101.0) == pytest.approx(1.0)
+        assert store.take("k", 3, 0.5, 102.0) == 0
+        assert store.take("other", 3, 0.5, 102.0) == 0
+
+    def test_sweeps_idle_buckets(self, store):
+        '''forgets buckets untouched since the cutoff.'''
+
+        store.take("old", 3, 0.5, 100.0)
+        store.take("new", 3, 0.5, 200.0)
+
+        assert store.sweep(150.0) == 1
+
+
+class TestLoginLimiter:
+    '''LoginLimiter in ratelimit.py'''
+
+    def test_limits_by_ip_and_username(self):
+        '''blocks a username across IPs, and an IP across usernames.'''
+
+        limiter = LoginLimiter(MemoryBucketStore(), ip_bucket=(2, 0.01), username_bucket=(2, 0.01))
+
+        assert limiter.check("1.1.1.1", "Ash") == 0
+        assert limiter.check("2.2.2.2", "ash") == 0
+        assert limiter.check("3.3.3.3", "ASH") > 0
+
+        assert limiter.check("1.1.1.1", "misty") == 0
+        assert limiter.check("1.1.1.1", "brock") > 0
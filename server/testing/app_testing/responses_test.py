@@ -0,0 +1,51 @@
+import gzip
+import json
+
+from app import app
+from models import db, Recipe, User
+
+
+class TestResponseEncoding:
+    '''Compact JSON and compression in responses.py'''
+
+    def test_compresses_large_json_for_accepting_clients(self):
+        '''gzips bodies over the threshold, weakens the ETag and still answers 304.'''
+
+        with app.app_context():
+            Recipe.query.delete()
+            User.query.delete()
+            db.session.commit()
+
+            user = User(username="Slagathor")
+            user.set_password('secret')
+            db.session.add(user)
+            db.session.commit()
+            db.session.add_all([
+                Recipe(title=f"Stew {i}", minutes_to_complete=30, user_id=user.id,
+                       instructions="Stir the pot slowly for a while, then leave it to simmer.")
+                for i in range(20)
+            ])
+            db.session.commit()
+
+        with app.test_client() as client:
+            client.post('/login', json={'username': 'Slagathor', 'password': 'secret'})
+
+            plain = client.get('/recipes')
+            assert 'Content-Encoding' not in plain.headers
+            assert b'\n' not in plain.data and b'": ' not in plain.data
+
+            response = client.get('/recipes', headers={'Accept-Encoding': 'gzip'})
+            assert response.headers['Content-Encoding'] == 'gzip'
+            assert 'Accept-Encoding' in response.headers['Vary']
+            assert gzip.decompress(response.data) == plain.data
+            assert len(response.data) < len(plain.data) / 3
+            assert response.headers['ETag'].startswith('W/')
+
+            cached = client.get('/recipes', headers={
+                'Accept-Encoding': 'gzip', 'If-None-Match': response.headers['ETag'],
+            })
+            assert cached.status_code == 304
+
+            small = client.get('/check_session', headers={'Accept-Encoding': 'gzip'})
+            assert 'Content-Encoding' not in small.headers
+            assert json.loads(small.data)['username'] == 'Slagathor'
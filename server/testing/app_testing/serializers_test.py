@@ -0,0 +1,57 @@
+import pytest
+
+from app import app
+from models import db, User, Recipe, recipe_serializer
+
+
+class TestSerializer:
+    '''Serializer in serializers.py'''
+
+    def test_dumps_objects_and_rows_alike(self):
+        '''builds the same nested dict from an ORM object and from a projected row.'''
+
+        with app.app_context():
+            Recipe.query.delete()
+            User.query.delete()
+            db.session.commit()
+
+            user = User(username="Slagathor")
+            user.set_password('secret')
+            db.session.add(user)
+            db.session.commit()
+
+            recipe = Recipe(
+                title="Toast",
+                instructions="Put the bread in the toaster and wait until it turns golden brown.",
+                minutes_to_complete=5,
+                user_id=user.id,
+            )
+            db.session.add(recipe)
+            db.session.commit()
+
+            expected = {
+                'id': recipe.id,
+                'title': "Toast",
+                'instructions': recipe.instructions,
+                'minutes_to_complete': 5,
+                'user': {'id': user.id, 'username': "Slagathor"},
+            }
+
+            assert recipe_serializer.dump(recipe) == expected
+
+            row = db.session.execute(recipe_serializer.select()).one()
+            assert recipe_serializer.dump_row(row) == expected
+
+    def test_projects_requested_fields(self):
+        '''selects only the requested columns and joins, and rejects unknown fields.'''
+
+        projected = recipe_serializer.project(["title", "user.username"])
+        sql = str(projected.select())
+
+        assert projected.fields == ("title", {"user": ("username",)})
+        assert "instructions" not in sql and "JOIN users" in sql
+        assert "JOIN" not in str(recipe_serializer.project(["id", "title"]).select())
+        assert recipe_serializer.project(["user.username", "title"]) is projected
+
+        with pytest.raises(ValueError, match="Unknown fields: body"):
+            recipe_serializer.project(["title", "body"])
@@ -0,0 +1,39 @@
+import time
+
+from sessions import MemorySessionStore, SQLiteSessionStore
+
+STORES = (MemorySessionStore, SQLiteSessionStore)
+
+
+class TestSessionStores:
+    '''Session stores in sessions.py'''
+
+    def test_loads_saved_sessions_until_expiry(self, store):
+        '''returns saved data until it expires, and sweeps expired rows.'''
+
+        store.save("live", 1, '{"user_id": 1}', time.time() + 60)
+        store.save("dead", 1, '{"user_id": 1}', time.time() - 1)
+
+        assert store.load("live") == '{"user_id": 1}'
+        assert store.load("dead") is None
+        assert store.sweep() == 1
+
+    def test_revokes_every_session_for_a_user(self, store):
+        '''deletes all sessions for one user and leaves others alone.'''
+
+        expires_at = time.time() + 60
+        store.save("a", 1, '{"user_id": 1}', expires_at)
+        store.save("b", 1, '{"user_id": 1}', expires_at)
+        store.save("c", 2, '{"user_id": 2}', expires_at)
+
+        assert store.revoke_user(1) == 2
+        assert store.load("a") is None
+        assert store.load("c") == '{"user_id": 2}'
+
+    def test_keeps_data_after_fork_reset(self, store):
+        '''reopens its connection after reset_after_fork without losing sessions.'''
+
+        store.save("a", 1, '{"user_id": 1}', time.time() + 60)
+        store.reset_after_fork()
+
+        assert store.load("a") == '{"user_id": 1}'
@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 
+import pytest
+
 def pytest_itemcollected(item):
     par = item.parent.obj
     node = item.obj
@@ -7,3 +9,21 @@ def pytest_itemcollected(item):
     suf = node.__doc__.strip() if node.__doc__ else node.__name__
     if pref or suf:
         item._nodeid = ' '.join((pref, suf))
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    """Each test module's STORES pair: a memory store, then one in a fresh SQLite file."""
+    memory_store, sqlite_store = request.module.STORES
+    if request.param == "memory":
+        return memory_store()
+    return sqlite_store(str(tmp_path / "store.db"))
+
+
+@pytest.fixture(autouse=True)
+def reset_login_limits():
+    """Each test starts with full login buckets, whatever earlier runs used up."""
+    from app import app
+    login_limiter = app.extensions["login_limiter"]
+    if login_limiter is not None:
+        login_limiter.store.clear()